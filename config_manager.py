@@ -6,12 +6,55 @@
 
 import json
 import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from operator import attrgetter
 from pathlib import Path
-from dataclasses import dataclass, asdict
-from typing import Dict, List, Optional, Any
+from dataclasses import dataclass, fields
+from typing import Dict, List, Optional, Any, Tuple
 
+try:
+    import orjson
+except ImportError:  # orjson 为可选依赖，未安装时回退到标准库json
+    orjson = None
 
-@dataclass
+
+def _dumps(data: Dict[str, Any]) -> bytes:
+    """将配置数据序列化为UTF-8编码的JSON字节串"""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    return json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8')
+
+
+def _loads(raw: bytes) -> Any:
+    """解析UTF-8编码的JSON字节串"""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw.decode('utf-8'))
+
+
+@lru_cache(maxsize=1)
+def _app_data_dir() -> str:
+    """获取应用数据目录（进程内只解析一次）"""
+    if os.name == 'nt':  # Windows
+        return os.path.join(os.environ['APPDATA'], "Photo-Watermark2")
+    else:  # 其他平台
+        return os.path.join(str(Path.home()), ".photo-watermark2")
+
+
+@lru_cache(maxsize=512)
+def _template_path(template_dir: str, name: str) -> str:
+    """获取模板文件的完整路径"""
+    return os.path.join(template_dir, f"{name}.json")
+
+
+# Python 3.10+ 使用 __slots__ 存储字段（更省内存、属性访问更快），低版本回退为普通 dataclass
+_DATACLASS_OPTIONS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+
+@dataclass(**_DATACLASS_OPTIONS)
 class WatermarkConfig:
     """水印配置数据类"""
     # 水印类型配置
@@ -47,15 +90,32 @@ class WatermarkConfig:
     stroke_color: str = "#FFFFFF"
 
 
+# WatermarkConfig 的全部字段名，用于从JSON数据构造配置时过滤未知键
+_WC_FIELDS = frozenset(f.name for f in fields(WatermarkConfig))
+
+# 按声明顺序的字段名及其取值器；字段均为不可变标量，无需 asdict() 的递归深拷贝
+_WC_FIELD_NAMES = tuple(f.name for f in fields(WatermarkConfig))
+_WC_GETTER = attrgetter(*_WC_FIELD_NAMES)
+
+
+def _config_to_dict(config: WatermarkConfig) -> Dict[str, Any]:
+    """将配置对象转换为可序列化的字典"""
+    return dict(zip(_WC_FIELD_NAMES, _WC_GETTER(config)))
+
+
 class ConfigManager:
     """配置管理器类"""
     
     def __init__(self):
         """初始化配置管理器"""
         # 获取应用数据目录
-        self.app_data_dir = self._get_app_data_dir()
+        self.app_data_dir = _app_data_dir()
         self.template_dir = os.path.join(self.app_data_dir, "templates")
         self.settings_file = os.path.join(self.app_data_dir, "settings.json")
+        self.font_cache_file = os.path.join(self.app_data_dir, "font_cache.json")
+        
+        # 串行化文件写入：后台线程保存配置时，同一目标文件的临时文件不会被同时写入
+        self._write_lock = threading.Lock()
         
         # 确保目录存在
         self._ensure_directories()
@@ -63,30 +123,33 @@ class ConfigManager:
         # 加载上次使用的配置
         self.last_config = self._load_last_config()
     
-    def _get_app_data_dir(self) -> str:
-        """获取应用数据目录"""
-        if os.name == 'nt':  # Windows
-            return os.path.join(os.environ['APPDATA'], "Photo-Watermark2")
-        else:  # 其他平台
-            return os.path.join(str(Path.home()), ".photo-watermark2")
-    
     def _ensure_directories(self):
         """确保必要的目录存在"""
         os.makedirs(self.app_data_dir, exist_ok=True)
         os.makedirs(self.template_dir, exist_ok=True)
     
+    def _write_json(self, path: str, data: Dict[str, Any]):
+        """原子写入JSON文件：整体写入临时文件后再替换目标文件"""
+        tmp_path = path + '.tmp'
+        raw = _dumps(data)
+        with self._write_lock:
+            # 64 KiB 缓冲足以容纳整份配置，关闭文件时只产生一次 write 系统调用；
+            # 不使用 buffering=0，以免原始 FileIO 的部分写入导致文件不完整
+            with open(tmp_path, 'wb', buffering=1 << 16) as f:
+                f.write(raw)
+            os.replace(tmp_path, path)
+    
+    def _read_config(self, path: str) -> WatermarkConfig:
+        """读取JSON文件并转换为配置对象（忽略未知字段）"""
+        with open(path, 'rb') as f:
+            data = _loads(f.read())
+        return WatermarkConfig(**{k: data[k] for k in data.keys() & _WC_FIELDS})
+    
     def _load_last_config(self) -> WatermarkConfig:
         """加载上次使用的配置"""
         try:
             if os.path.exists(self.settings_file):
-                with open(self.settings_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    # 将数据转换为配置对象
-                    config = WatermarkConfig()
-                    for key, value in data.items():
-                        if hasattr(config, key):
-                            setattr(config, key, value)
-                    return config
+                return self._read_config(self.settings_file)
         except Exception as e:
             print(f"加载上次配置失败: {e}")
         
@@ -96,19 +159,17 @@ class ConfigManager:
     def save_last_config(self, config: WatermarkConfig):
         """保存当前配置为上次使用的配置"""
         try:
-            data = asdict(config)
-            with open(self.settings_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            data = _config_to_dict(config)
+            self._write_json(self.settings_file, data)
         except Exception as e:
             print(f"保存配置失败: {e}")
     
     def save_template(self, name: str, config: WatermarkConfig) -> bool:
         """保存配置为模板"""
         try:
-            template_file = os.path.join(self.template_dir, f"{name}.json")
-            data = asdict(config)
-            with open(template_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            template_file = _template_path(self.template_dir, name)
+            data = _config_to_dict(config)
+            self._write_json(template_file, data)
             return True
         except Exception as e:
             print(f"保存模板失败: {e}")
@@ -117,39 +178,54 @@ class ConfigManager:
     def load_template(self, name: str) -> Optional[WatermarkConfig]:
         """加载模板"""
         try:
-            template_file = os.path.join(self.template_dir, f"{name}.json")
-            if os.path.exists(template_file):
-                with open(template_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    # 将数据转换为配置对象
-                    config = WatermarkConfig()
-                    for key, value in data.items():
-                        if hasattr(config, key):
-                            setattr(config, key, value)
-                    return config
+            return self._read_config(_template_path(self.template_dir, name))
+        except FileNotFoundError:
+            pass
         except Exception as e:
             print(f"加载模板失败: {e}")
         return None
     
     def get_template_list(self) -> List[str]:
         """获取所有模板列表"""
-        templates = []
+        return sorted(entry.name[:-5] for entry in self._template_entries())  # 移除 .json 后缀
+    
+    def load_all_templates(self) -> List[Tuple[str, WatermarkConfig]]:
+        """并行读取全部模板，返回按名称排序的 (模板名, 配置) 列表；读取失败的模板会被跳过"""
+        entries = sorted(self._template_entries(), key=lambda entry: entry.name)
+        if not entries:
+            return []
+        with ThreadPoolExecutor(max_workers=min(8, len(entries))) as executor:
+            results = list(executor.map(self._load_template_entry, entries))
+        return [result for result in results if result is not None]
+    
+    def _template_entries(self) -> List[os.DirEntry]:
+        """枚举模板目录中的 .json 文件"""
         try:
-            if os.path.exists(self.template_dir):
-                for file in os.listdir(self.template_dir):
-                    if file.endswith('.json'):
-                        templates.append(file[:-5])  # 移除 .json 后缀
+            with os.scandir(self.template_dir) as it:
+                # DirEntry.is_file() 复用目录枚举时得到的属性
+                return [entry for entry in it
+                        if entry.name.endswith('.json') and entry.is_file()]
+        except FileNotFoundError:
+            pass
         except Exception as e:
             print(f"获取模板列表失败: {e}")
-        return sorted(templates)
+        return []
+    
+    def _load_template_entry(self, entry: os.DirEntry) -> Optional[Tuple[str, WatermarkConfig]]:
+        """读取单个模板文件，直接使用 DirEntry.path 而不重新拼接路径"""
+        try:
+            return entry.name[:-5], self._read_config(entry.path)
+        except Exception as e:
+            print(f"加载模板失败: {e}")
+            return None
     
     def delete_template(self, name: str) -> bool:
         """删除模板"""
         try:
-            template_file = os.path.join(self.template_dir, f"{name}.json")
-            if os.path.exists(template_file):
-                os.remove(template_file)
-                return True
+            os.remove(_template_path(self.template_dir, name))
+            return True
+        except FileNotFoundError:
+            pass
         except Exception as e:
             print(f"删除模板失败: {e}")
         return False
\ No newline at end of file
@@ -1,58 +1,269 @@
-import matplotlib.font_manager as fm
-from fontTools.ttLib import TTFont
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
+
+# 检查基本汉字范围（CJK统一汉字）的测试字符："中"；支持该字的字体几乎都覆盖常用汉字
+_CJK_PROBE = 0x4E2D
+# 永远不会被分配字符的码位（非字符 U+10FFFF），任何字体都会把它渲染为 .notdef 字形
+_NOTDEF_PROBE = 0x10FFFF
+# 探测时使用的字号，足以区分字形与 .notdef，渲染开销很小
+_PROBE_SIZE = 12
+
+
+# fm.findSystemFonts() 的进程内缓存，以各字体目录的修改时间判断是否失效
+_SYSTEM_FONTS_CACHE = {"paths": None, "signature": None}
+
+
+def _font_root_dirs():
+    """
+    返回 matplotlib 查找系统字体时遍历的字体根目录（包括当前尚不存在的用户字体目录）
+    """
+    # 延迟导入：导入 matplotlib.font_manager 本身就会触发一次系统字体扫描
+    import matplotlib.font_manager as fm
+    
+    if sys.platform == 'win32':
+        return [fm.win32FontDirectory(), *fm.MSUserFontDirectories]
+    elif sys.platform == 'darwin':
+        return [*fm.X11FontDirectories, *fm.OSXFontDirectories]
+    return list(fm.X11FontDirectories)
+
+
+def _collect_dir_mtimes(font_dir, mtimes):
+    """
+    记录 font_dir 及其下各级子目录的修改时间到 mtimes（{目录: mtime_ns}），不存在的目录记为 None；
+    任意一级目录中增删文件或子目录都会改变该级目录的修改时间
+    """
+    if font_dir in mtimes:
+        return
+    try:
+        mtimes[font_dir] = os.stat(font_dir).st_mtime_ns
+    except OSError:
+        mtimes[font_dir] = None
+        return
+    try:
+        with os.scandir(font_dir) as it:
+            # 不跟随符号链接，与 findSystemFonts 遍历目录的方式一致，也避免链接成环
+            subdirs = [entry.path for entry in it if entry.is_dir(follow_symlinks=False)]
+    except OSError:
+        return
+    for subdir in subdirs:
+        _collect_dir_mtimes(subdir, mtimes)
+
+
+def _font_dirs_signature():
+    """
+    计算系统字体目录的签名（各级目录及其修改时间，不存在的目录记为 None），
+    目录中增删字体、新建子目录或新建用户字体目录时签名随之变化
+    """
+    mtimes = {}
+    for font_dir in _font_root_dirs():
+        _collect_dir_mtimes(font_dir, mtimes)
+    return tuple(sorted(mtimes.items()))
+
+
+def find_system_fonts():
+    """
+    获取系统字体文件列表，字体目录未变化时直接复用上次的扫描结果
+    """
+    import matplotlib.font_manager as fm
+    
+    signature = _font_dirs_signature()
+    if _SYSTEM_FONTS_CACHE["paths"] is None or _SYSTEM_FONTS_CACHE["signature"] != signature:
+        _SYSTEM_FONTS_CACHE["paths"] = fm.findSystemFonts()
+        _SYSTEM_FONTS_CACHE["signature"] = signature
+    return _SYSTEM_FONTS_CACHE["paths"]
+
+
 def check_chinese_support_fonttools(font_path):
     """
-    使用fonttools快速检测中文支持
+    快速检测字体是否支持中文（历史名称保留；现通过 FreeType 探测，不再依赖 fontTools）
+    """
+    return get_chinese_font_info(font_path) is not None
+
+
+def get_chinese_font_info(font_path):
+    """
+    检测字体是否支持中文，支持时返回 (名称, 字体族)，否则返回None
+    """
+    try:
+        mtime = os.path.getmtime(font_path)
+    except OSError:
+        return None
+    supported, name, family = _check_chinese_support_impl(font_path, mtime)
+    return (name, family) if supported else None
+
+
+@lru_cache(maxsize=4096)
+def _check_chinese_support_impl(font_path, mtime):
+    """
+    检测结果按 (路径, 修改时间) 缓存，字体文件更新后自动失效
+
+    返回 (是否支持中文, 名称, 字体族)。通过 FreeType 渲染探测字符判断：
+    FreeType 只按需查找单个字符的字形，无需像 fontTools 那样解析整张 cmap 表（中文字体的 cmap 有数万项）；
+    字体缺少该字符时会渲染出 .notdef 字形（通常是方框），因此与一个不可能被分配的码位的渲染结果比较
     """
+    # 延迟导入：只用到字体检测的调用方在真正检测时才加载 PIL
+    from PIL import ImageFont
+    
     try:
-        font = TTFont(font_path)
-        cmap_table = font['cmap']
+        # index=0 使 .ttc 字体集合也能被检测
+        font = ImageFont.truetype(font_path, _PROBE_SIZE, index=0)
+        mask = font.getmask(chr(_CJK_PROBE))
+        if mask.getbbox() is None:
+            return (False, None, None)
+        notdef = font.getmask(chr(_NOTDEF_PROBE))
+        if mask.size == notdef.size and bytes(mask) == bytes(notdef):
+            return (False, None, None)
         
-        for table in cmap_table.tables:
-            if table.format == 4:
-                cmap = table.cmap
-                # 检查基本汉字范围（CJK统一汉字）
-                test_codepoints = [
-                    0x4E2D,  # "中"
-                    0x6587,  # "文"
-                    0x6D4B,  # "测"
-                    0x8BD5,  # "试"
-                ]
-                
-                supported = sum(1 for cp in test_codepoints if cp in cmap)
-                return supported >= 3  # 至少支持3个测试字符
-                
-        return False
-    except:
-        return False
+        font_name = font.getname()[0]
+        if not font_name:
+            return (False, None, None)
+        return (True, font_name, font_name)
+    except (OSError, ValueError):
+        # 文件无法读取或不是 FreeType 支持的字体，视为不支持中文
+        return (False, None, None)
  
-def get_chinese_fonts_fast():
+def _scan_font(font_path):
+    """
+    检测单个字体文件，返回缓存条目中的检测结果部分
+    """
+    entry = {'is_chinese': False, 'name': None, 'family': None}
+    info = get_chinese_font_info(font_path)
+    if info:
+        entry['is_chinese'] = True
+        entry['name'], entry['family'] = info
+    return entry
+
+
+def _load_font_cache(cache_file):
+    """读取字体扫描缓存，返回 {'signature': 目录签名, 'entries': {字体路径: 缓存条目}}（旧版缓存为后者）"""
+    if not cache_file:
+        return {}
+    try:
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+        return cache if isinstance(cache, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_font_cache(cache_file, cache):
+    """原子写入字体扫描缓存（先写临时文件再替换）"""
+    tmp_file = cache_file + '.tmp'
+    try:
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(cache, f, ensure_ascii=False)
+        os.replace(tmp_file, cache_file)
+    except OSError as e:
+        print(f"保存字体缓存失败: {e}")
+
+
+def _dirs_signature(font_paths):
+    """
+    计算字体所在目录的签名：系统字体根目录下各级目录，以及不在其中的字体文件父目录的修改时间。
+    尚不存在的目录记为 None，之后被创建时同样视为变化
+    """
+    mtimes = dict(_font_dirs_signature())
+    for path in font_paths:
+        font_dir = os.path.dirname(path)
+        if font_dir not in mtimes:
+            try:
+                mtimes[font_dir] = os.stat(font_dir).st_mtime_ns
+            except OSError:
+                mtimes[font_dir] = None
+    return [[font_dir, mtime] for font_dir, mtime in sorted(mtimes.items())]
+
+
+def _signature_unchanged(signature):
+    """检查缓存中记录的目录签名是否与当前文件系统一致"""
+    if not signature:
+        return False
+    for font_dir, mtime in signature:
+        try:
+            current = os.stat(font_dir).st_mtime_ns
+        except OSError:
+            current = None
+        if current != mtime:
+            return False
+    return True
+
+
+def get_chinese_fonts_fast(cache_file=None, max_workers=8):
     """
     快速获取支持中文的字体
+
+    cache_file 为字体扫描缓存路径（通常是 ConfigManager.font_cache_file）。
+    字体目录签名与缓存一致时直接使用缓存结果，不再遍历字体目录和逐个检查字体文件；
+    否则只有新增或修改过（mtime/size 变化）的字体才会重新解析，
+    其余字体的解析通过线程池并行执行。
     """
+    cache = _load_font_cache(cache_file)
+    if 'entries' in cache:
+        cached_entries = cache['entries'] if isinstance(cache['entries'], dict) else {}
+        signature = cache.get('signature')
+    else:
+        # 旧版缓存只保存了 {字体路径: 缓存条目}
+        cached_entries, signature = cache, None
+    
+    if _signature_unchanged(signature):
+        all_fonts = list(cached_entries)
+        entries = cached_entries
+    else:
+        all_fonts = find_system_fonts()
+        entries = _scan_fonts(all_fonts, cached_entries, max_workers)
+        if cache_file:
+            # 条目按字体列表的顺序保存，下次签名一致时可直接按此顺序返回
+            entries = {path: entries[path] for path in all_fonts if path in entries}
+            _save_font_cache(cache_file, {'signature': _dirs_signature(entries), 'entries': entries})
+    
     chinese_fonts = []
-    all_fonts = fm.findSystemFonts()
+    for font_path in all_fonts:
+        entry = entries.get(font_path)
+        if not entry or not entry['is_chinese']:
+            continue
+        font_name = entry['name']
+        if '?' in font_name:
+            continue
+        chinese_fonts.append({
+            'name': font_name,
+            'path': font_path,
+            'family': entry['family']
+        })
     
+    return chinese_fonts
+
+
+def _scan_fonts(all_fonts, cache, max_workers):
+    """
+    返回 {字体路径: 缓存条目}：未变化（mtime/size 一致）的字体沿用缓存条目，其余字体并行重新解析
+    """
+    entries = {}
+    pending = {}
     for font_path in all_fonts:
-        # print(font_path)
         try:
-            if check_chinese_support_fonttools(font_path):
-                font_prop = fm.FontProperties(fname=font_path)
-                font_name = font_prop.get_name()
-                if '?' in font_name:
-                    continue
-                chinese_fonts.append({
-                    'name': font_name,
-                    'path': font_path,
-                    'family': font_prop.get_family()[0] if font_prop.get_family() else font_name
-                })
-        except:
+            st = os.stat(font_path)
+        except OSError:
             continue
+        cached = cache.get(font_path)
+        if cached and cached.get('mtime') == st.st_mtime_ns and cached.get('size') == st.st_size:
+            entries[font_path] = cached
+        else:
+            pending[font_path] = st
     
-    return chinese_fonts
+    if pending:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(_scan_font, path): path for path in pending}
+            for future in as_completed(futures):
+                font_path = futures[future]
+                st = pending[font_path]
+                entry = future.result()
+                entry.update(path=font_path, mtime=st.st_mtime_ns, size=st.st_size)
+                entries[font_path] = entry
+    return entries
 
 
-from PIL import Image, ImageDraw, ImageFont
 # def create_chinese_text_image():
 #     # 查找系统中文字体
 #     chinese_fonts = [f for f in fm.findSystemFonts() if 'sim' in f.lower() or 'hei' in f.lower()]
@@ -91,25 +302,27 @@ from PIL import Image, ImageDraw, ImageFont
 
 # create_chinese_text_image()
 
-from PIL import Image, ImageDraw, ImageFont, ImageFilter
-import os
+# PIL 仅在下列绘制函数中按需导入，只用到字体检测的调用方无需承担其导入开销
+@lru_cache(maxsize=128)
+def _get_font(path, size, index=0):
+    """加载字体并按 (路径, 字号, 索引) 缓存，重复绘制时不再重新解析字体文件"""
+    from PIL import ImageFont
+    
+    return ImageFont.truetype(path, size, index=index)
 
 def create_bold_effect(image, text, font, fill='black', bold_strength=2):
-    """通过多次绘制创建粗体效果"""
-    draw = ImageDraw.Draw(image)
+    """通过同色描边创建粗体效果"""
+    from PIL import ImageDraw
     
-    # 原始文本
-    draw.text((10, 10), text, fill=fill, font=font)
+    draw = ImageDraw.Draw(image)
     
-    # 粗体效果：多次偏移绘制
-    for dx in range(1, bold_strength + 1):
-        for dy in range(1, bold_strength + 1):
-            draw.text((10 + dx, 10 + dy), text, fill=fill, font=font)
-            draw.text((10 - dx, 10 - dy), text, fill=fill, font=font)
+    # 粗体效果：用与文字同色的描边加粗笔画，字形只需光栅化一次
+    draw.text((10, 10), text, fill=fill, font=font,
+              stroke_width=bold_strength, stroke_fill=fill)
 
 def create_italic_effect(draw, text, position, font, fill='black', italic_angle=15):
     """创建斜体效果（通过剪切变换）"""
-    from PIL import ImageTransform
+    from PIL import Image, ImageDraw, ImageTransform
     
     # 获取文本尺寸
     bbox = font.getbbox(text)
@@ -132,9 +345,11 @@ def create_italic_effect(draw, text, position, font, fill='black', italic_angle=
 
 # 使用示例
 def demo_manual_effects():
+    from PIL import Image, ImageDraw
+    
     image = Image.new('RGB', (400, 200), 'white')
     draw = ImageDraw.Draw(image)
-    font = ImageFont.truetype("arial.ttf", 24)
+    font = _get_font("arial.ttf", 24)
     
     # 正常文本
     draw.text((10, 10), "正常文本", fill='black', font=font)
@@ -157,16 +372,29 @@ def demo_manual_effects():
 # except OSError:
 #     print("从Windows字体目录加载字体失败")
 
+@lru_cache(maxsize=8)
+def _dir_entries(font_dir):
+    """
+    一次性枚举字体目录中的文件名（按平台规则规范大小写），替代逐个 os.path.exists
+    """
+    with os.scandir(font_dir) as it:
+        return frozenset(os.path.normcase(entry.name) for entry in it)
+
+
 def find_italic_windows_specific(font_path):
     """
     Windows系统特定的斜体字体查找
     """
-    if not os.path.exists(font_path):
-        return None
-    
     font_dir = os.path.dirname(font_path)
     font_filename = os.path.basename(font_path)
     
+    try:
+        entries = _dir_entries(font_dir)
+    except OSError:
+        return None
+    if os.path.normcase(font_filename) not in entries:
+        return None
+    
     # 通用Windows模式
     patterns = [
         font_filename.replace('.ttf', 'i.ttf'),
@@ -178,14 +406,15 @@ def find_italic_windows_specific(font_path):
     for pattern in patterns:
         if pattern == font_filename: continue
         print(f"pattern: {pattern}")
-        italic_path = os.path.join(font_dir, pattern)
-        if os.path.exists(italic_path):
+        if os.path.normcase(pattern) in entries:
+            italic_path = os.path.join(font_dir, pattern)
             print(f"从字体目录中找到了斜体字体：{italic_path}")
             return italic_path
     
     return None
 
 
- 
-font_path='C:\\Windows\\Fonts\\simfang.ttf'
-print(find_italic_windows_specific(font_path))
\ No newline at end of file
+
+if __name__ == "__main__":
+    font_path='C:\\Windows\\Fonts\\simfang.ttf'
+    print(find_italic_windows_specific(font_path))
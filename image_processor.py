@@ -4,22 +4,130 @@
 图片处理器 - 负责图片的加载、水印处理和导出
 """
 
+import io
 import os
-from PIL import Image, ImageDraw, ImageFont, ImageEnhance
+import threading
+from functools import lru_cache
+from PIL import Image, ImageDraw, ImageFont, ImageFilter, ImageChops
 from PIL import ImageTransform
 from PyQt5.QtGui import QPixmap, QImage
-from typing import Optional, Tuple, List
+from typing import Optional, Tuple
 from config_manager import WatermarkConfig
-from fontTools.ttLib import TTFont
-import matplotlib.font_manager as fm
+import getfonts
+
+
+# 斜体效果的水平斜切系数
+_ITALIC_SHEAR = 15 / 45
+
+# 支持 draft 按缩小比例解码的格式，这些格式的图片延迟到首次使用时再解码
+_DRAFT_FORMATS = ('JPEG', 'MPO')
+
+# 单通道恒等查找表，用于 Image.point 中保持通道不变
+_IDENTITY_LUT = list(range(256))
+
+
+@lru_cache(maxsize=64)
+def _parse_color(color_str: str) -> Tuple[int, int, int]:
+    """解析颜色字符串为RGB元组（结果缓存，批量处理时同一颜色只解析一次）"""
+    try:
+        if color_str.startswith('#'):
+            # 处理HEX颜色：一次整数转换后按位取出各分量
+            color_str = color_str.lstrip('#')
+            if len(color_str) == 6:
+                value = int(color_str, 16)
+                return ((value >> 16) & 0xFF, (value >> 8) & 0xFF, value & 0xFF)
+        # 默认黑色
+        return (0, 0, 0)
+    except (AttributeError, ValueError):
+        return (0, 0, 0)
+
+
+def _alpha_composite_clipped(base: Image.Image, overlay: Image.Image, x: int, y: int):
+    """将 overlay 原地合成到 base 的 (x, y) 处，超出 base 范围的部分被裁掉
+    
+    （旧版 Pillow 的 alpha_composite 不接受负的目标坐标）
+    """
+    left, top = max(x, 0), max(y, 0)
+    right = min(x + overlay.width, base.width)
+    bottom = min(y + overlay.height, base.height)
+    if left >= right or top >= bottom:
+        return
+    base.alpha_composite(overlay, (left, top), (left - x, top - y, right - x, bottom - y))
+
+
+def _composite(image: Image.Image, overlay: Image.Image, x: int, y: int) -> Image.Image:
+    """返回在 image 副本的 (x, y) 处合成RGBA图像 overlay 的结果，只处理 overlay 覆盖的区域
+    
+    不带透明信息的图片合成到RGB副本上：目标完全不透明时
+    out = src * a + dst * (1 - a) 与 alpha_composite 等价，
+    省去整幅图片转换为RGBA、导出JPEG时再压平回RGB的两次整幅处理
+    """
+    if _has_alpha(image):
+        result = image.copy() if image.mode == 'RGBA' else image.convert('RGBA')
+        _alpha_composite_clipped(result, overlay, x, y)
+    else:
+        result = image.copy() if image.mode == 'RGB' else image.convert('RGB')
+        result.paste(overlay, (x, y), overlay)
+    return result
+
+
+def _has_alpha(image: Image.Image) -> bool:
+    """图片是否带有透明信息"""
+    return image.mode in ('RGBA', 'LA', 'PA', 'RGBa', 'La') or 'transparency' in image.info
+
+
+# 逐块编码原始像素时每块的字节数
+_RAW_CHUNK_SIZE = 1 << 20
+
+
+def _raw_pixels(image: Image.Image, buffer: bytearray):
+    """将图像的全部原始像素数据写入 buffer 开头并返回 buffer（调用方保证其长度足够）
+    
+    raw 编码器逐块输出、每块直接复制到 buffer 中，不会为整幅图像分配新的字节串；
+    内部接口不可用时回退为返回 tobytes() 的结果
+    """
+    try:
+        image.load()
+        encoder = Image._getencoder(image.mode, 'raw', image.mode)
+        encoder.setimage(image.im, (0, 0) + image.size)
+        offset = 0
+        while True:
+            length, errcode, data = encoder.encode(_RAW_CHUNK_SIZE)
+            buffer[offset:offset + length] = data
+            offset += length
+            if errcode == 1:  # 编码完成
+                return buffer
+            if errcode < 0:
+                break
+    except Exception:
+        pass
+    return image.tobytes()
 
 
 class ImageProcessor:
     """图片处理器类"""
     
+    # 文本水印层缓存的最大条目数
+    _TEXT_LAYER_CACHE_SIZE = 32
+    # 图片水印层缓存的最大条目数（图片水印层通常比文本层大得多）
+    _IMAGE_LAYER_CACHE_SIZE = 8
+    
+    # 支持中文的系统字体列表：首次调用 get_supported_fonts 时扫描，进程内所有实例共享
+    _supported_fonts = None
+    
     def __init__(self):
         """初始化图片处理器"""
         self.supported_formats = ['.jpg', '.jpeg', '.png', '.bmp', '.tiff', '.tif']
+        # 已解析的水印字体及其 (ascent, descent) 度量，键为 (字体路径, 字号)
+        self._font_cache = {}
+        # 已渲染的文本水印层，键为文本、字体及效果参数
+        self._text_layer_cache = {}
+        # 已缩放、调整透明度并旋转的图片水印层，键为水印文件及其修改时间、缩放、透明度、旋转角度和画质
+        self._image_layer_cache = {}
+        # 保护上述缓存的首次写入（批量处理时多个线程共享同一实例）
+        self._cache_lock = threading.Lock()
+        # image_to_pixmap 复用的像素缓冲区，只在图片变大时重新分配
+        self._pixmap_buffer = bytearray()
     
     def load_image(self, file_path: str) -> Optional[Image.Image]:
         """加载图片"""
@@ -33,53 +141,105 @@ class ImageProcessor:
             if ext not in self.supported_formats:
                 raise ValueError(f"不支持的文件格式: {ext}")
             
-            # 打开图片
-            image = Image.open(file_path)
-            # 转换为RGBA模式以支持透明通道
-            if image.mode != 'RGBA':
-                image = image.convert('RGBA')
+            # 读入压缩数据后立即关闭文件（避免大量图片同时占用文件句柄），像素延迟到首次使用时再解码；
+            # 不再统一转换为RGBA，由需要像素的处理步骤按需转换
+            with open(file_path, 'rb') as f:
+                image = Image.open(io.BytesIO(f.read()))
+            if image.format not in _DRAFT_FORMATS:
+                # 只有 JPEG 能从延迟解码中获益（缩略图可按缩小比例解码），其余格式立即解码
+                image.load()
             
             return image
         except Exception as e:
             print(f"加载图片失败: {e}")
             return None
     
-    def image_to_pixmap(self, image: Image.Image) -> QPixmap:
-        """将PIL图片转换为PyQt的QPixmap"""
+    def image_to_pixmap(self, image: Image.Image,
+                        max_preview_size: Optional[Tuple[int, int]] = None) -> QPixmap:
+        """将PIL图片转换为PyQt的QPixmap（只能在界面线程调用）
+        
+        指定 max_preview_size 时先用双线性插值缩小到该尺寸以内再转换，适用于预览大图
+        """
         try:
-            # 如果图片是RGBA模式，需要特殊处理
-            if image.mode == 'RGBA':
-                # 创建带有Alpha通道的QImage
-                q_image = QImage(image.tobytes(), image.width, image.height, image.width * 4, QImage.Format_RGBA8888)
-            else:
-                # 转换为RGB模式
-                if image.mode != 'RGB':
-                    image = image.convert('RGB')
-                q_image = QImage(image.tobytes(), image.width, image.height, image.width * 3, QImage.Format_RGB888)
+            image = self._prepare_for_qt(image, max_preview_size)
             
+            # 像素写入复用的缓冲区，频繁刷新预览时不再每次分配整幅图像大小的字节串
+            size = image.width * image.height * len(image.getbands())
+            if len(self._pixmap_buffer) < size:
+                self._pixmap_buffer = bytearray(size)
+            q_image = self._wrap_qimage(image, _raw_pixels(image, self._pixmap_buffer))
+            
+            # QImage 只引用 data 而不复制，fromImage 会把像素复制到 QPixmap 中，
+            # 因此返回后缓冲区即可被下一次调用覆盖
             return QPixmap.fromImage(q_image)
         except Exception as e:
             print(f"转换图片失败: {e}")
             return QPixmap()
     
-    def add_text_watermark(self, image: Image.Image, config: WatermarkConfig) -> Image.Image:
-        """添加文本水印"""
-        # 确保文本是字符串类型
-        text = str(config.text_content)
+    def image_to_qimage(self, image: Image.Image,
+                        max_preview_size: Optional[Tuple[int, int]] = None) -> QImage:
+        """将PIL图片转换为持有自身像素数据的QImage，可在后台线程调用（QPixmap 只能在界面线程创建）"""
+        try:
+            image = self._prepare_for_qt(image, max_preview_size)
+            data = _raw_pixels(image, bytearray(image.width * image.height * len(image.getbands())))
+            # copy 使 QImage 拥有独立的像素数据，不再依赖 data 的生命周期
+            return self._wrap_qimage(image, data).copy()
+        except Exception as e:
+            print(f"转换图片失败: {e}")
+            return QImage()
+    
+    def _prepare_for_qt(self, image: Image.Image, max_preview_size: Optional[Tuple[int, int]]) -> Image.Image:
+        """缩小（如果需要）并转换为RGB或预乘透明度的RGBa模式"""
+        if max_preview_size and (image.width > max_preview_size[0] or image.height > max_preview_size[1]):
+            image = image.copy()
+            image.thumbnail(max_preview_size, Image.BILINEAR)
         
-        # 创建一个透明的水印层
-        watermark = Image.new('RGBA', image.size, (255, 255, 255, 0))
-        draw = ImageDraw.Draw(watermark)
+        # 其他模式先转换：带透明度的转换为RGBA，其余转换为RGB
+        if image.mode not in ('RGB', 'RGBA', 'RGBa'):
+            image = image.convert('RGBA' if _has_alpha(image) else 'RGB')
+        if image.mode == 'RGBA':
+            # 转换时一次性预乘透明度：Qt 内部以预乘格式绘制，之后每次重绘都不必再逐像素相乘
+            image = image.convert('RGBa')
+        return image
+    
+    def _wrap_qimage(self, image: Image.Image, data) -> QImage:
+        """用 data 中的原始像素构造（不复制数据的）QImage"""
+        # 如果图片带透明通道，需要特殊处理
+        if image.mode == 'RGBa':
+            # 创建带有（预乘）Alpha通道的QImage
+            return QImage(data, image.width, image.height, image.width * 4,
+                          QImage.Format_RGBA8888_Premultiplied)
+        return QImage(data, image.width, image.height, image.width * 3, QImage.Format_RGB888)
+    
+    def _resolve_font(self, font_path: str, size: int) -> tuple:
+        """解析水印字体（含回退到默认字体和系统中文字体的逻辑），结果按 (路径, 字号) 缓存
         
-        # 设置字体
+        返回 (font, metrics)：metrics 为字体的 (ascent, descent)，字体不提供度量时为 None
+        """
+        key = (font_path, size)
+        if key in self._font_cache:
+            return self._font_cache[key]
+        with self._cache_lock:
+            # 批量处理时其他线程可能已完成解析
+            if key not in self._font_cache:
+                font = self._load_font(font_path, size)
+                try:
+                    # 度量来自字体头部，对同一 (字体, 字号) 固定不变
+                    metrics = font.getmetrics()
+                except AttributeError:
+                    metrics = None
+                self._font_cache[key] = (font, metrics)
+            return self._font_cache[key]
+    
+    def _load_font(self, font_path: str, size: int):
+        """加载字体，失败时依次回退到默认字体和系统中文字体"""
         font = None
-        font_path = config.font_family  # 现在config.font_family存储的是字体路径
         
         # 尝试直接使用配置中的字体路径
         try:
             if font_path:
                 # 直接使用路径加载字体，不再尝试查找粗体/斜体版本
-                font = ImageFont.truetype(font_path, config.font_size)
+                font = ImageFont.truetype(font_path, size)
             else:
                 # 如果没有指定字体路径，尝试使用默认字体
                 font = ImageFont.load_default()
@@ -121,7 +281,7 @@ class ImageProcessor:
                     if os.path.exists(path):
                         print(f"找到中文字体: {path}")
                         font_path = path
-                        font = ImageFont.truetype(path, config.font_size)
+                        font = ImageFont.truetype(path, size)
                         # 测试字体是否支持中文
                         if self.check_chinese_support_fonttools(font_path):
                             print("字体支持中文，使用该字体")
@@ -138,467 +298,388 @@ class ImageProcessor:
                 font = None
                 print("无法加载默认字体")
         
-        # 获取文本尺寸
-        if font:
+        return font
+    
+    def _get_text_layer(self, text: str, font, metrics, config: WatermarkConfig) -> tuple:
+        """获取文本水印层，按文本、字体及全部效果参数缓存
+        
+        批量处理相同配置的图片时只需渲染一次（位置不影响水印层本身）
+        """
+        key = (text, font, config.font_color, config.opacity, config.font_bold, config.font_italic,
+               config.stroke_enabled, config.stroke_width, config.stroke_color,
+               config.shadow_enabled, config.shadow_offset_x, config.shadow_offset_y, config.shadow_color,
+               config.rotation)
+        cached = self._text_layer_cache.get(key)
+        if cached is not None:
+            return cached
+        # 渲染也在锁内进行：同一配置只渲染一次，且 FreeType 字体对象不会被多个线程同时使用
+        with self._cache_lock:
+            cached = self._text_layer_cache.get(key)
+            if cached is None:
+                cached = self._render_text_layer(text, font, metrics, config)
+                if len(self._text_layer_cache) >= self._TEXT_LAYER_CACHE_SIZE:
+                    # 淘汰最早加入的条目
+                    del self._text_layer_cache[next(iter(self._text_layer_cache))]
+                self._text_layer_cache[key] = cached
+            return cached
+    
+    def _render_text_layer(self, text: str, font, metrics, config: WatermarkConfig) -> tuple:
+        """渲染文本水印层（描边、阴影、粗体、斜体、旋转）
+        
+        metrics 为 _resolve_font 得到的 (ascent, descent)，为 None 时按墨迹边界框测量文本。
+        返回 (layer, offset_x, offset_y, text_width, text_height)：layer 为按内容裁剪后的RGBA图像，
+        offset 为其相对文本绘制位置的偏移；没有可见内容时 layer 为 None
+        """
+        # 获取文本尺寸：宽度取字符串前进宽度，高度取字体的 ascent + descent，都无需排版整段文字；
+        # 前进宽度不含字形的左右伸出部分，蒙版四周为此多留 margin 像素
+        text_width, text_height = len(text) * 12, 20  # 默认尺寸估计
+        ink_width, ink_height, margin = text_width, text_height, 0
+        measured = False
+        if font and metrics:
+            try:
+                text_width = int(font.getlength(text))
+                text_height = metrics[0] + metrics[1]
+                ink_width, ink_height, margin = text_width, text_height, text_height // 4
+                measured = True
+            except (AttributeError, ValueError):
+                # 旧版Pillow没有 getlength；多行文本无法测量前进宽度
+                pass
+        if font and not measured:
             try:
-                # 使用getbbox获取文本边界框（PIL 10.0+支持）
-                bbox = draw.textbbox((0, 0), text, font=font)
+                bbox = ImageDraw.Draw(Image.new('L', (1, 1))).textbbox((0, 0), text, font=font)
                 text_width = bbox[2] - bbox[0]
                 text_height = bbox[3] - bbox[1]
-            except:
-                # 兼容性处理
-                try:
-                    text_width, text_height = draw.textsize(text, font=font)
-                except Exception as e:
-                    print(f"获取文本尺寸失败: {e}")
-                    # 默认尺寸估计
-                    text_width = len(text) * 12
-                    text_height = 20
-        else:
-            # 默认尺寸估计
-            text_width = len(text) * 12
-            text_height = 20
-        
-        # 计算水印位置
-        pos_x = int((image.width - text_width) * config.position_x)
-        pos_y = int((image.height - text_height) * config.position_y)
+                ink_width, ink_height = bbox[2], bbox[3]
+            except Exception as e:
+                print(f"获取文本尺寸失败: {e}")
         
         # 解析颜色
-        color = self._parse_color(config.font_color)
+        color = _parse_color(config.font_color)
         color_with_opacity = (*color, int(255 * config.opacity))
+        stroke_fill = (*_parse_color(config.stroke_color), 255) if config.stroke_enabled else None
+        shadow = (((*_parse_color(config.shadow_color), 255), config.shadow_offset_x, config.shadow_offset_y)
+                  if config.shadow_enabled else None)
         
-        # 添加描边效果
-        if config.stroke_enabled:
-            stroke_color = self._parse_color(config.stroke_color)
-            stroke_width = config.stroke_width
-            # 绘制描边（在文本周围绘制多个偏移的文本）
-            for x_offset in range(-stroke_width, stroke_width + 1):
-                for y_offset in range(-stroke_width, stroke_width + 1):
-                    if x_offset != 0 or y_offset != 0:
-                        draw.text(
-                            (pos_x + x_offset, pos_y + y_offset),
-                            text,
-                            font=font,
-                            fill=(*stroke_color, 255)
-                        )
-        
-        # 添加阴影效果
-        if config.shadow_enabled:
-            shadow_color = self._parse_color(config.shadow_color)
-            draw.text(
-                (pos_x + config.shadow_offset_x, pos_y + config.shadow_offset_y),
-                text,
-                font=font,
-                fill=(*shadow_color, 255)
-            )
-        
-        # 绘制主文本
-        if font:
-            # 处理斜体效果 - 使用临时图像旋转实现
-            if config.font_italic:
-                # 创建一个临时图像来绘制斜体文本 - 进一步增加左侧空间
-                temp_size = (text_width + 80, text_height + 40)  # 增加左侧边距
-                temp_img = Image.new('RGBA', temp_size, (255, 255, 255, 0))
-                temp_draw = ImageDraw.Draw(temp_img)
-                
-                # 为斜体文本增加透明度 - 这里将透明度增大15%使其更不透明
-                italic_opacity_factor = 80  # 透明度系数，大于1表示更不透明（增大透明度）
-                italic_alpha = min(255, int(255 * config.opacity*1.05 + italic_opacity_factor))  # 确保不超过255
-                italic_color_with_opacity = (*color, italic_alpha)
-                
-                # 首先处理粗体效果（如果需要）
-                if config.font_bold:
-                    # 增强粗体效果：增加偏移量和绘制更多方向
-                    # 模拟粗体：在原位置的上下左右及对角线各绘制一次
-                    temp_draw.text((40-2, 20-2), text, font=font, fill=italic_color_with_opacity)
-                    temp_draw.text((40+2, 20-2), text, font=font, fill=italic_color_with_opacity)
-                    temp_draw.text((40-2, 20+2), text, font=font, fill=italic_color_with_opacity)
-                    temp_draw.text((40+2, 20+2), text, font=font, fill=italic_color_with_opacity)
-                    temp_draw.text((40-1, 20), text, font=font, fill=italic_color_with_opacity)
-                    temp_draw.text((40+1, 20), text, font=font, fill=italic_color_with_opacity)
-                    temp_draw.text((40, 20-1), text, font=font, fill=italic_color_with_opacity)
-                    temp_draw.text((40, 20+1), text, font=font, fill=italic_color_with_opacity)
-                
-                # 绘制主文本到临时图像 - 进一步增加左边距
-                temp_draw.text((40, 20), text, font=font, fill=italic_color_with_opacity)
-                
-                # 应用斜体变换 - 减少倾斜程度
-                italic_img = temp_img.transform(
-                    temp_size,  # 使用完整的临时图像大小
-                    ImageTransform.AffineTransform((1, 15/45, 0, 0, 1, 0))  # 减少倾斜因子
-                )
-            
-                # 计算放置位置并粘贴到水印层 - 进一步左移
-                paste_x = pos_x - 20
-                paste_y = pos_y - 10
-                
-                watermark.paste(italic_img, (paste_x, paste_y), italic_img)
-            else:
-                # 不是斜体，直接绘制
-                # 处理粗体效果 - 通过多次绘制模拟粗体
-                if config.font_bold:
-                    # 增强粗体效果：增加偏移量和绘制更多方向
-                    # 模拟粗体：在原位置的上下左右及对角线各绘制一次
-                    draw.text((pos_x-2, pos_y-2), text, font=font, fill=color_with_opacity)
-                    draw.text((pos_x+2, pos_y-2), text, font=font, fill=color_with_opacity)
-                    draw.text((pos_x-2, pos_y+2), text, font=font, fill=color_with_opacity)
-                    draw.text((pos_x+2, pos_y+2), text, font=font, fill=color_with_opacity)
-                    draw.text((pos_x-1, pos_y), text, font=font, fill=color_with_opacity)
-                    draw.text((pos_x+1, pos_y), text, font=font, fill=color_with_opacity)
-                    draw.text((pos_x, pos_y-1), text, font=font, fill=color_with_opacity)
-                    draw.text((pos_x, pos_y+1), text, font=font, fill=color_with_opacity)
-                
-                # 绘制主文本
-                draw.text((pos_x, pos_y), text, font=font, fill=color_with_opacity)
-        else:
-            # 如果没有字体，使用PIL的默认文本绘制
-            draw.text((pos_x, pos_y), text, fill=color_with_opacity)
-        
-        # 处理文字水印旋转 - 围绕文字中心旋转
-        if config.rotation != 0 and font:
-            # 计算原始文字中心位置
-            text_center_x = pos_x + text_width // 2
-            text_center_y = pos_y + text_height // 2
-            
-            # 清除之前绘制的内容，重新创建水印层
-            watermark = Image.new('RGBA', image.size, (255, 255, 255, 0))
-            
-            # 计算旋转所需的最小临时图像大小
-            import math
-            angle_rad = math.radians(abs(config.rotation))
-            # 使用三角函数计算旋转后所需的宽高
-            temp_width = int(text_width * math.cos(angle_rad) + text_height * math.sin(angle_rad)) + 100
-            temp_height = int(text_height * math.cos(angle_rad) + text_width * math.sin(angle_rad)) + 100
-            temp_size = (max(temp_width, temp_height), max(temp_width, temp_height))  # 确保是正方形
-            
-            # 创建临时图像
-            temp_img = Image.new('RGBA', temp_size, (255, 255, 255, 0))
-            temp_draw = ImageDraw.Draw(temp_img)
-            
-            # 临时图像中心点
-            temp_center = temp_size[0] // 2
-            
-            # 在临时图像中心绘制文本
-            # 计算文本绘制位置，使文本在临时图像中居中
-            if config.font_italic:
-                # 对于斜体文本，先创建中间图像应用斜体变换
-                italic_temp_size = (text_width + 50, text_height + 50)
-                italic_temp = Image.new('RGBA', italic_temp_size, (255, 255, 255, 0))
-                italic_draw = ImageDraw.Draw(italic_temp)
-                
-                # 为斜体文本增加透明度
-                italic_opacity_factor = 80
-                italic_alpha = min(255, int(255 * config.opacity*1.05 + italic_opacity_factor))
-                italic_color_with_opacity = (*color, italic_alpha)
-                
-                # 斜体文本中心位置
-                italic_center_x = italic_temp_size[0] // 2
-                italic_center_y = italic_temp_size[1] // 2
-                
-                # 先添加描边效果（在粗体和主文本之前）
-                if config.stroke_enabled:
-                    stroke_color = self._parse_color(config.stroke_color)
-                    stroke_width = config.stroke_width
-                    # 描边只使用外边框，不是整个区域
-                    for x_offset in range(-stroke_width, stroke_width + 1):
-                        for y_offset in range(-stroke_width, stroke_width + 1):
-                            # 只绘制真正的边框，不是整个方形区域
-                            if abs(x_offset) == stroke_width or abs(y_offset) == stroke_width:
-                                italic_draw.text(
-                                    (italic_center_x - text_width // 2 + x_offset, 
-                                     italic_center_y - text_height // 2 + y_offset), 
-                                    text, font=font, fill=(*stroke_color, 255)
-                                )
-                
-                # 添加阴影效果（在主文本之前）
-                if config.shadow_enabled:
-                    shadow_color = self._parse_color(config.shadow_color)
-                    italic_draw.text(
-                        (italic_center_x - text_width // 2 + config.shadow_offset_x, 
-                         italic_center_y - text_height // 2 + config.shadow_offset_y), 
-                        text, font=font, fill=(*shadow_color, 255)
-                    )
-                
-                # 粗体效果
-                if config.font_bold:
-                    # 在原位置周围多个方向绘制文本以模拟粗体
-                    directions = [(-1, -1), (1, -1), (-1, 1), (1, 1), (-1, 0), (1, 0), (0, -1), (0, 1)]
-                    for dx, dy in directions:
-                        italic_draw.text(
-                            (italic_center_x - text_width // 2 + dx, 
-                             italic_center_y - text_height // 2 + dy), 
-                            text, font=font, fill=italic_color_with_opacity
-                        )
-                
-                # 最后绘制主文本，确保它在所有效果之上
-                italic_draw.text(
-                    (italic_center_x - text_width // 2, italic_center_y - text_height // 2), 
-                    text, font=font, fill=italic_color_with_opacity
-                )
-                
-                # 应用斜体变换
-                italic_img = italic_temp.transform(
-                    italic_temp_size,
-                    ImageTransform.AffineTransform((1, 15/45, 0, 0, 1, 0))
-                )
-                
-                # 将斜体文本粘贴到主临时图像中心
-                paste_x = temp_center - italic_img.width // 2
-                paste_y = temp_center - italic_img.height // 2
-                temp_img.paste(italic_img, (paste_x, paste_y), italic_img)
-            else:
-                # 非斜体文本
-                # 先添加描边效果（在所有其他效果之前）
-                if config.stroke_enabled:
-                    stroke_color = self._parse_color(config.stroke_color)
-                    stroke_width = config.stroke_width
-                    # 描边只使用外边框，不是整个区域
-                    for x_offset in range(-stroke_width, stroke_width + 1):
-                        for y_offset in range(-stroke_width, stroke_width + 1):
-                            # 只绘制真正的边框，不是整个方形区域
-                            if abs(x_offset) == stroke_width or abs(y_offset) == stroke_width:
-                                temp_draw.text(
-                                    (temp_center - text_width // 2 + x_offset, 
-                                     temp_center - text_height // 2 + y_offset), 
-                                    text, font=font, fill=(*stroke_color, 255)
-                                )
-                
-                # 添加阴影效果（在主文本之前）
-                if config.shadow_enabled:
-                    shadow_color = self._parse_color(config.shadow_color)
-                    temp_draw.text(
-                        (temp_center - text_width // 2 + config.shadow_offset_x, 
-                         temp_center - text_height // 2 + config.shadow_offset_y),
-                        text,
-                        font=font,
-                        fill=(*shadow_color, 255)
-                    )
-                
-                # 粗体效果
-                if config.font_bold:
-                    directions = [(-1, -1), (1, -1), (-1, 1), (1, 1), (-1, 0), (1, 0), (0, -1), (0, 1)]
-                    for dx, dy in directions:
-                        temp_draw.text(
-                            (temp_center - text_width // 2 + dx, 
-                             temp_center - text_height // 2 + dy), 
-                            text, font=font, fill=color_with_opacity
-                        )
-                
-                # 最后绘制主文本，确保它在所有效果之上
-                temp_draw.text(
-                    (temp_center - text_width // 2, temp_center - text_height // 2), 
-                    text, font=font, fill=color_with_opacity
-                )
-            
-            # 旋转临时图像，确保expand=True以包含整个旋转结果
-            rotated_img = temp_img.rotate(config.rotation, expand=True, fillcolor=(255, 255, 255, 0))
-            
-            # 计算旋转后的图像放置位置，确保旋转中心与原始文本中心重合
-            paste_x = text_center_x - rotated_img.width // 2
-            paste_y = text_center_y - rotated_img.height // 2
-            
-            # 粘贴旋转后的图像到水印层
-            watermark.paste(rotated_img, (paste_x, paste_y), rotated_img)
+        # 以文本中心为画布中心
+        center_x = text_width // 2
+        center_y = text_height // 2
+        
+        # 文本只光栅化一次，粗体和描边通过对蒙版做膨胀得到，斜体直接对蒙版做斜切
+        masks = self._build_text_masks(text, font, config, ink_width, ink_height, center_y, margin)
+        mask_width, mask_height = masks[0].size
+        origin_x, origin_y = masks[3], masks[4]
+        
+        # 记录各方向上效果的最大延伸，使画布中心与文本中心重合，旋转时无需再换算中心位置
+        shadow_x, shadow_y = (config.shadow_offset_x, config.shadow_offset_y) if shadow else (0, 0)
+        half_width = max(center_x + origin_x + max(0, -shadow_x),
+                         mask_width - origin_x + max(0, shadow_x) - center_x)
+        half_height = max(center_y + origin_y + max(0, -shadow_y),
+                          mask_height - origin_y + max(0, shadow_y) - center_y)
+        
+        canvas_size = (2 * half_width, 2 * half_height)
+        if config.rotation == 0:
+            # 按 描边 → 阴影 → 主文本（含粗体效果）的顺序绘制到紧凑的临时图像上
+            watermark = Image.new('RGBA', canvas_size, (255, 255, 255, 0))
+            self._paint_text(watermark, half_width - center_x, half_height - center_y,
+                             masks, color_with_opacity, stroke_fill, shadow)
         else:
-            # 非旋转情况下，也需要确保正确的绘制顺序
-            # 重新绘制水印层，确保正确的效果顺序
-            if config.stroke_enabled and font:
-                # 移除之前绘制的内容
-                watermark = Image.new('RGBA', image.size, (255, 255, 255, 0))
-                draw = ImageDraw.Draw(watermark)
-                
-                # 重新按正确顺序绘制所有效果
-                # 1. 先添加描边效果
-                stroke_color = self._parse_color(config.stroke_color)
-                stroke_width = config.stroke_width
-                # 描边只使用外边框，不是整个区域
-                for x_offset in range(-stroke_width, stroke_width + 1):
-                    for y_offset in range(-stroke_width, stroke_width + 1):
-                        # 只绘制真正的边框，不是整个方形区域
-                        if abs(x_offset) == stroke_width or abs(y_offset) == stroke_width:
-                            draw.text(
-                                (pos_x + x_offset, pos_y + y_offset),
-                                text,
-                                font=font,
-                                fill=(*stroke_color, 255)
-                            )
-                
-                # 2. 然后添加阴影效果
-                if config.shadow_enabled:
-                    shadow_color = self._parse_color(config.shadow_color)
-                    draw.text(
-                        (pos_x + config.shadow_offset_x, pos_y + config.shadow_offset_y),
-                        text,
-                        font=font,
-                        fill=(*shadow_color, 255)
-                    )
-                
-                # 3. 处理粗体效果
+            watermark = self._paint_rotated_text(canvas_size, half_width - center_x, half_height - center_y,
+                                                 masks, config.rotation, color_with_opacity, stroke_fill, shadow)
+        
+        # 裁剪到可见内容，偏移量换算为相对文本绘制位置
+        content_box = watermark.getbbox()
+        if content_box is None:
+            return None, 0, 0, text_width, text_height
+        layer = watermark.crop(content_box)
+        return (layer,
+                content_box[0] - (watermark.width // 2 - center_x),
+                content_box[1] - (watermark.height // 2 - center_y),
+                text_width, text_height)
+    
+    def _build_text_masks(self, text: str, font, config: WatermarkConfig,
+                          ink_width: int, ink_height: int, center_y: int, margin: int = 0) -> tuple:
+        """光栅化文本蒙版，并通过最大值滤波（膨胀）得到粗体蒙版和描边外环蒙版，斜体时再对蒙版做斜切
+        
+        返回 (main_mask, text_mask, stroke_mask, origin_x, origin_y)：文本原点位于蒙版的 (origin_x, origin_y) 处；
+        main_mask 为主文本使用的蒙版（粗体时为膨胀后的蒙版），未启用描边时 stroke_mask 为 None；
+        margin 为文本四周额外保留的空白，用于容纳超出测量尺寸的字形
+        """
+        stroke_width = max(config.stroke_width, 0) if config.stroke_enabled else 0
+        pad = stroke_width + 2 + margin
+        text_mask = Image.new('L', (ink_width + 2 * pad, ink_height + 2 * pad), 0)
+        ImageDraw.Draw(text_mask).text((pad, pad), text, font=font, fill=255)
+        
+        # 5x5 膨胀，对应原先在四周（对角线偏移两像素）多次绘制文本模拟的粗体
+        main_mask = text_mask.filter(ImageFilter.MaxFilter(5)) if config.font_bold else text_mask
+        
+        stroke_mask = None
+        if config.stroke_enabled:
+            # 描边围绕主文本（粗体时为加粗后的文本，粗体膨胀半径为 2）
+            outline_width = stroke_width + 2 if config.font_bold else stroke_width
+            try:
+                # FreeType 原生描边：一次光栅化得到沿字形轮廓外扩的文本，转角为圆角
+                dilated = Image.new('L', text_mask.size, 0)
+                ImageDraw.Draw(dilated).text((pad, pad), text, font=font, fill=255, stroke_width=outline_width)
                 if config.font_bold:
-                    directions = [(-1, -1), (1, -1), (-1, 1), (1, 1), (-1, 0), (1, 0), (0, -1), (0, 1)]
-                    for dx, dy in directions:
-                        draw.text(
-                            (pos_x + dx, pos_y + dy),
-                            text,
-                            font=font,
-                            fill=color_with_opacity
-                        )
-                
-                # 4. 最后绘制主文本
-                draw.text(
-                    (pos_x, pos_y),
-                    text,
-                    font=font,
-                    fill=color_with_opacity
-                )
-        
-        # 合成图片
-        result = Image.new('RGBA', image.size, (255, 255, 255, 0))
-        result.paste(image, (0, 0))
-        result.alpha_composite(watermark)
-        
-        # 如果图像模式不是RGBA，转换为RGB
-        if result.mode == 'RGBA':
-            background = Image.new('RGB', result.size, (255, 255, 255))
-            background.paste(result, mask=result.split()[3])
-            result = background
-        
-        return result
+                    # 保证描边完整覆盖加粗后的文本
+                    dilated = ImageChops.lighter(dilated, main_mask)
+            except Exception:
+                # 位图字体不支持描边参数：连续 w 次 3x3 膨胀，等价于一次 (2w+1)x(2w+1) 膨胀，但每像素只需 9w 次比较
+                dilated = main_mask
+                for _ in range(stroke_width):
+                    dilated = dilated.filter(ImageFilter.MaxFilter(3))
+            # 去掉文本内部，只保留外环
+            stroke_mask = ImageChops.subtract(dilated, main_mask)
+        
+        if not config.font_italic:
+            return main_mask, text_mask, stroke_mask, pad, pad
+        
+        # 斜体：围绕文本水平中线做斜切，中线以上右移、以下左移，画布按倾斜量精确加宽以免裁掉笔画；
+        # 斜切在单通道蒙版上进行，数据量只有RGBA的四分之一
+        width, height = text_mask.size
+        center_row = pad + center_y
+        extend_left = int(_ITALIC_SHEAR * (height - center_row)) + 1
+        extend_right = int(_ITALIC_SHEAR * center_row) + 1
+        sheared_size = (width + extend_left + extend_right, height)
+        # AffineTransform 给出的是输出坐标到输入坐标的映射
+        shear = ImageTransform.AffineTransform(
+            (1, _ITALIC_SHEAR, -extend_left - _ITALIC_SHEAR * center_row, 0, 1, 0))
+        
+        def sheared(mask):
+            return mask.transform(sheared_size, shear, resample=Image.BILINEAR) if mask is not None else None
+        
+        sheared_text = sheared(text_mask)
+        sheared_main = sheared_text if main_mask is text_mask else sheared(main_mask)
+        return sheared_main, sheared_text, sheared(stroke_mask), pad + extend_left, pad
+    
+    def _paint_text(self, canvas: Image.Image, x: int, y: int, masks: tuple,
+                    fill, stroke_fill=None, shadow=None):
+        """在画布的 (x, y) 处按 描边 → 阴影 → 主文本 的顺序填充文本蒙版
+        
+        shadow 为 (填充色, x偏移, y偏移)；填充色或 shadow 为 None 的部分跳过
+        """
+        main_mask, text_mask, stroke_mask, origin_x, origin_y = masks
+        x -= origin_x
+        y -= origin_y
+        if stroke_fill is not None:
+            canvas.paste(stroke_fill, (x, y), stroke_mask)
+        if shadow is not None:
+            shadow_fill, shadow_x, shadow_y = shadow
+            canvas.paste(shadow_fill, (x + shadow_x, y + shadow_y), text_mask)
+        if fill is not None:
+            canvas.paste(fill, (x, y), main_mask)
+    
+    def _paint_rotated_text(self, canvas_size: Tuple[int, int], x: int, y: int, masks: tuple, rotation: float,
+                            fill, stroke_fill=None, shadow=None) -> Image.Image:
+        """旋转单通道蒙版后再着色，返回旋转后的RGBA文本层
+        
+        各蒙版先放到以文字中心为中心的画布上（阴影蒙版按偏移放置，使偏移随文字一起旋转），
+        围绕画布中心旋转（expand=True）后再按 描边 → 阴影 → 主文本 的顺序填充；
+        旋转在L蒙版上进行，数据量只有旋转整幅RGBA图层的四分之一
+        """
+        main_mask, text_mask, stroke_mask, origin_x, origin_y = masks
+        x -= origin_x
+        y -= origin_y
+        
+        def rotated(mask, mask_x, mask_y):
+            placed = Image.new('L', canvas_size, 0)
+            placed.paste(mask, (mask_x, mask_y))
+            return placed.rotate(rotation, expand=True)
+        
+        layers = []
+        if stroke_fill is not None:
+            layers.append((stroke_fill, rotated(stroke_mask, x, y)))
+        if shadow is not None:
+            shadow_fill, shadow_x, shadow_y = shadow
+            layers.append((shadow_fill, rotated(text_mask, x + shadow_x, y + shadow_y)))
+        if fill is not None:
+            layers.append((fill, rotated(main_mask, x, y)))
+        
+        # 旋转后的尺寸只取决于画布尺寸和角度，各蒙版一致
+        size = layers[0][1].size if layers else canvas_size
+        watermark = Image.new('RGBA', size, (255, 255, 255, 0))
+        for layer_fill, mask in layers:
+            watermark.paste(layer_fill, (0, 0), mask)
+        return watermark
+    
+    def add_text_watermark(self, image: Image.Image, config: WatermarkConfig) -> Image.Image:
+        """添加文本水印"""
+        # 确保文本是字符串类型
+        text = str(config.text_content)
+        
+        # 设置字体（现在config.font_family存储的是字体路径）
+        font, metrics = self._resolve_font(config.font_family, config.font_size)
+        
+        # 获取（缓存的）文本水印层
+        layer, offset_x, offset_y, text_width, text_height = self._get_text_layer(text, font, metrics, config)
+        
+        # 计算水印位置
+        pos_x = int((image.width - text_width) * config.position_x)
+        pos_y = int((image.height - text_height) * config.position_y)
+        
+        # 合成图片：在原图的一份副本上合成（调用方持有的原图保持不变），只处理水印层覆盖的区域；
+        # 保留透明通道，JPEG 所需的背景填充在导出时进行
+        if layer is None:
+            return image.copy()
+        return _composite(image, layer, pos_x + offset_x, pos_y + offset_y)
     
-    def add_image_watermark(self, image: Image.Image, watermark_image_path: str, config: WatermarkConfig) -> Image.Image:
-        """添加图片水印"""
+    def add_image_watermark(self, image: Image.Image, watermark_image_path: str, config: WatermarkConfig,
+                            preview: bool = False) -> Image.Image:
+        """添加图片水印
+        
+        preview 为 True 时（界面实时预览）用双线性插值缩放水印图片，导出时仍使用 LANCZOS
+        """
         try:
-            # 加载水印图片
-            watermark_img = Image.open(watermark_image_path)
-            if watermark_img.mode != 'RGBA':
-                watermark_img = watermark_img.convert('RGBA')
-            
-            # 调整水印大小
-            new_width = int(watermark_img.width * config.image_scale)
-            new_height = int(watermark_img.height * config.image_scale)
-            watermark_img = watermark_img.resize((new_width, new_height), Image.LANCZOS)
-            
-            # 调整透明度
-            if config.opacity < 1.0:
-                alpha = watermark_img.split()[3]
-                alpha = ImageEnhance.Brightness(alpha).enhance(config.opacity)
-                watermark_img.putalpha(alpha)
-            
-            # 旋转水印
-            if config.rotation != 0:
-                watermark_img = watermark_img.rotate(config.rotation, expand=1, fillcolor=(255, 255, 255, 0))
+            # 获取（缓存的）图片水印层：拖动位置时只需重新合成，无需重新打开、缩放和旋转水印图片
+            watermark_img = self._get_image_layer(watermark_image_path, config, preview)
             
             # 计算水印位置
             pos_x = int((image.width - watermark_img.width) * config.position_x)
             pos_y = int((image.height - watermark_img.height) * config.position_y)
             
-            # 合成图片
-            result = Image.new('RGBA', image.size, (255, 255, 255, 0))
-            result.paste(image, (0, 0))
-            result.paste(watermark_img, (pos_x, pos_y), watermark_img)
-            
-            return result
+            # 合成图片：与文本水印相同，在原图副本上只处理水印覆盖的区域
+            return _composite(image, watermark_img, pos_x, pos_y)
         except Exception as e:
             print(f"添加图片水印失败: {e}")
             return image.copy()
     
-    def process_image(self, image: Image.Image, config: WatermarkConfig) -> Image.Image:
-        """处理图片，添加水印"""
+    def _get_image_layer(self, watermark_image_path: str, config: WatermarkConfig, preview: bool) -> Image.Image:
+        """获取图片水印层，按水印文件（含修改时间）及缩放、透明度、旋转参数缓存（位置不影响水印层本身）"""
+        key = (watermark_image_path, os.stat(watermark_image_path).st_mtime_ns,
+               config.image_scale, config.opacity, config.rotation, preview)
+        cached = self._image_layer_cache.get(key)
+        if cached is not None:
+            return cached
+        with self._cache_lock:
+            cached = self._image_layer_cache.get(key)
+            if cached is None:
+                cached = self._render_image_layer(watermark_image_path, config, preview)
+                if len(self._image_layer_cache) >= self._IMAGE_LAYER_CACHE_SIZE:
+                    # 淘汰最早加入的条目
+                    del self._image_layer_cache[next(iter(self._image_layer_cache))]
+                self._image_layer_cache[key] = cached
+            return cached
+    
+    def _render_image_layer(self, watermark_image_path: str, config: WatermarkConfig, preview: bool) -> Image.Image:
+        """加载水印图片并依次缩放、调整透明度、旋转，返回RGBA水印层"""
+        # 加载水印图片
+        watermark_img = Image.open(watermark_image_path)
+        if watermark_img.mode != 'RGBA':
+            watermark_img = watermark_img.convert('RGBA')
+        
+        # 调整水印大小
+        new_width = int(watermark_img.width * config.image_scale)
+        new_height = int(watermark_img.height * config.image_scale)
+        watermark_img = watermark_img.resize((new_width, new_height),
+                                             Image.BILINEAR if preview else Image.LANCZOS)
+        
+        # 调整透明度：一次按通道查表（RGB 不变，Alpha 乘以不透明度），无需拆分和回写透明通道
+        if config.opacity < 1.0:
+            alpha_lut = [int(value * config.opacity) for value in range(256)]
+            watermark_img = watermark_img.point(_IDENTITY_LUT * 3 + alpha_lut)
+        
+        # 旋转水印
+        if config.rotation != 0:
+            watermark_img = watermark_img.rotate(config.rotation, expand=1, fillcolor=(255, 255, 255, 0))
+        return watermark_img
+    
+    def process_image(self, image: Image.Image, config: WatermarkConfig, preview: bool = False) -> Image.Image:
+        """处理图片，添加水印（preview 为 True 时使用更快的预览画质）"""
+        # 延迟解码的图片（JPEG）在这里一次性解码，之后的转换、复制和合成都直接使用内存中的像素
+        image.load()
         if config.watermark_type == "text":
             return self.add_text_watermark(image, config)
         elif config.watermark_type == "image" and config.image_path:
-            return self.add_image_watermark(image, config.image_path, config)
-        return image.copy()
+            return self.add_image_watermark(image, config.image_path, config, preview)
+        # 无需添加水印时直接返回原图（不复制），调用方如需修改应自行复制
+        return image
     
     def export_image(self, image: Image.Image, output_path: str, file_format: str = 'PNG', 
-                    quality: int = 90, resize: Optional[Tuple[int, int]] = None) -> bool:
-        """导出图片"""
+                    quality: int = 90, resize: Optional[Tuple[int, int]] = None,
+                    high_quality: bool = True, png_compress_level: int = 1,
+                    png_optimize: bool = False, jpeg_optimize: bool = False,
+                    jpeg_progressive: bool = False) -> bool:
+        """导出图片
+        
+        high_quality 控制缩放时使用的插值方法：True 为 LANCZOS（最清晰），False 为更快的 BICUBIC。
+        png_compress_level / png_optimize 控制PNG压缩：默认 1 级压缩，编码速度比 Pillow 默认的 6 级
+        快数倍，文件约大 15%；需要更小的文件时可传入 png_compress_level=9, png_optimize=True。
+        JPEG 默认使用 4:2:0 色度抽样的基线编码；jpeg_optimize（优化霍夫曼表）和 jpeg_progressive（渐进式）
+        能稍微减小文件，但编码需要额外的扫描，批量导出时默认关闭
+        """
         try:
-            # 调整大小（如果需要）
-            export_img = image.copy()
+            # 调整大小（如果需要）；resize、convert 和背景合成都会生成新图像，save 不修改图像，
+            # 因此无需预先复制原图
+            export_img = image
             if resize:
-                export_img = export_img.resize(resize, Image.LANCZOS)
+                export_img = export_img.resize(resize, Image.LANCZOS if high_quality else Image.BICUBIC)
+            
+            # 先编码到内存
+            buffer = io.BytesIO()
             
             # 转换为适合输出的模式
             if file_format.upper() == 'JPEG':
                 # JPEG不支持透明通道，转换为RGB
+                if export_img.mode not in ('RGB', 'RGBA'):
+                    export_img = export_img.convert('RGBA' if _has_alpha(export_img) else 'RGB')
                 if export_img.mode == 'RGBA':
+                    # 以自身透明通道为蒙版一次贴到白色RGB背景上，与合成到不透明白底等价，
+                    # 无需拆分透明通道，也省去合成后再转换为RGB的一次整幅处理
                     background = Image.new('RGB', export_img.size, (255, 255, 255))
-                    background.paste(export_img, mask=export_img.split()[3])
+                    background.paste(export_img, (0, 0), export_img)
                     export_img = background
-                export_img.save(output_path, format='JPEG', quality=quality)
+                export_img.save(buffer, format='JPEG', quality=quality, subsampling=2,
+                                optimize=jpeg_optimize, progressive=jpeg_progressive)
             else:  # PNG
-                if export_img.mode != 'RGBA':
-                    export_img = export_img.convert('RGBA')
-                export_img.save(output_path, format='PNG')
+                # 不透明的图片直接保存为RGB，无需补出一个全不透明的通道
+                if export_img.mode not in ('RGB', 'RGBA'):
+                    export_img = export_img.convert('RGBA' if _has_alpha(export_img) else 'RGB')
+                export_img.save(buffer, format='PNG',
+                                compress_level=png_compress_level, optimize=png_optimize)
             
+            # 编码结果一次写入文件：避免编码器逐块写入时的大量小块 write 调用，
+            # 编码失败时也不会留下不完整的输出文件
+            with open(output_path, 'wb') as f:
+                f.write(buffer.getbuffer())
             return True
         except Exception as e:
             print(f"导出图片失败: {e}")
             return False
     
-    def _parse_color(self, color_str: str) -> Tuple[int, int, int]:
-        """解析颜色字符串为RGB元组"""
+    def create_thumbnail(self, image: Image.Image, size: Tuple[int, int] = (128, 128),
+                         resample: int = Image.BILINEAR) -> Optional[Image.Image]:
+        """创建缩略图，失败时返回 None
+        
+        列表中显示的小尺寸缩略图用双线性插值即可，与 LANCZOS 的差别肉眼难以分辨
+        """
         try:
-            if color_str.startswith('#'):
-                # 处理HEX颜色
-                color_str = color_str.lstrip('#')
-                if len(color_str) == 6:
-                    return tuple(int(color_str[i:i+2], 16) for i in (0, 2, 4))
-            # 默认黑色
-            return (0, 0, 0)
-        except:
-            return (0, 0, 0)
-    
-    def create_thumbnail(self, image: Image.Image, size: Tuple[int, int] = (128, 128)) -> Image.Image:
-        """创建缩略图"""
-        thumbnail = image.copy()
-        thumbnail.thumbnail(size, Image.LANCZOS)
-        return thumbnail
+            if image.format in _DRAFT_FORMATS and image.tile and isinstance(image.fp, io.BytesIO):
+                # 尚未解码的 JPEG：从同一份压缩数据另开一个句柄，用 draft 让解码器直接按缩小比例
+                # 解码（最多缩小到 1/8），原图句柄不受影响
+                thumbnail = Image.open(io.BytesIO(image.fp.getvalue()))
+                thumbnail.draft('RGB', size)
+            else:
+                thumbnail = image.copy()
+            if thumbnail.mode not in ('RGB', 'RGBA'):
+                thumbnail = thumbnail.convert('RGBA' if _has_alpha(thumbnail) else 'RGB')
+            thumbnail.thumbnail(size, resample)
+            return thumbnail
+        except Exception as e:
+            print(f"创建缩略图失败: {e}")
+            return None
     
-    def check_chinese_support_fonttools(self,font_path):
+    def check_chinese_support_fonttools(self, font_path):
         """
-        使用fonttools快速检测中文支持
+        快速检测字体是否支持中文（实现位于 getfonts 模块）
         """
-        try:
-            font = TTFont(font_path)
-            cmap_table = font['cmap']
-            
-            for table in cmap_table.tables:
-                if table.format == 4:
-                    cmap = table.cmap
-                    # 检查基本汉字范围（CJK统一汉字）
-                    test_codepoints = [
-                        0x4E2D,  # "中"
-                        0x6587,  # "文"
-                        0x6D4B,  # "测"
-                        0x8BD5,  # "试"
-                    ]
-                    
-                    supported = sum(1 for cp in test_codepoints if cp in cmap)
-                    return supported >= 3  # 至少支持3个测试字符
-                    
-            return False
-        except:
-            return False
-    def get_supported_fonts(self):
-        """
-        快速获取支持中文的字体
+        return getfonts.check_chinese_support_fonttools(font_path)
+    
+    def get_supported_fonts(self, cache_file: Optional[str] = None):
         """
-        chinese_fonts = []
-        all_fonts = fm.findSystemFonts()
+        快速获取支持中文的字体（每个进程只扫描一次，重新创建主窗口时直接复用）
         
-        for font_path in all_fonts:
-            try:
-                if self.check_chinese_support_fonttools(font_path):
-                    font_prop = fm.FontProperties(fname=font_path)
-                    font_name = font_prop.get_name()
-                    if '?' not in font_name:
-                        chinese_fonts.append({
-                            'name': font_name,
-                            'path': font_path,
-                        })
-            except:
-                continue
-        # print(f"支持中文的字体: {chinese_fonts}")
-        return chinese_fonts
\ No newline at end of file
+        cache_file 为字体扫描结果的持久化缓存路径，再次启动时只需重新解析新增或修改过的字体
+        """
+        if ImageProcessor._supported_fonts is None:
+            ImageProcessor._supported_fonts = getfonts.get_chinese_fonts_fast(cache_file)
+        return ImageProcessor._supported_fonts
@@ -6,15 +6,21 @@
 
 import os
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import astuple, replace
+from functools import lru_cache, partial
+from typing import Callable, Optional
 from PyQt5.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, 
     QFileDialog, QListWidget, QListWidgetItem, QSplitter, QGroupBox, 
     QComboBox, QLineEdit, QSlider, QCheckBox, QColorDialog, QTabWidget,
     QDoubleSpinBox, QSpinBox, QMessageBox, QFrame, QGridLayout, QRadioButton, QInputDialog,
-    QScrollArea
+    QScrollArea, QProgressDialog
 )
-from PyQt5.QtGui import QPixmap, QFont, QIcon
-from PyQt5.QtCore import Qt, QSize, QPoint, pyqtSignal
+from PyQt5.QtGui import QPixmap, QPixmapCache, QImage, QFont, QIcon, QColor
+from PyQt5.QtCore import Qt, QSize, QPoint, QEvent, QTimer, QObject, QRunnable, QThreadPool, pyqtSignal
+from PIL import Image
 
 from image_processor import ImageProcessor
 from config_manager import ConfigManager, WatermarkConfig
@@ -30,37 +36,41 @@ def setup_global_font():
     if app:
         app.setFont(font)
 
-# 确保QApplication已经导入
-from PyQt5.QtWidgets import QApplication
 
-class ImageListItem(QWidget):
-    """图片列表项"""
+def _is_same_file(path: str, other: str) -> bool:
+    """判断两个路径是否指向同一个文件
     
-    def __init__(self, thumbnail: QPixmap, filename: str, parent=None):
-        super().__init__(parent)
-        
-        # 设置布局
-        layout = QHBoxLayout(self)
-        layout.setContentsMargins(5, 5, 5, 5)
-        
-        # 缩略图
-        self.thumbnail_label = QLabel()
-        self.thumbnail_label.setPixmap(thumbnail)
-        self.thumbnail_label.setFixedSize(80, 80)  # 增大缩略图尺寸
-        self.thumbnail_label.setScaledContents(True)
-        
-        # 文件名
-        self.filename_label = QLabel(filename)
-        self.filename_label.setWordWrap(True)
-        self.filename_label.setAlignment(Qt.AlignVCenter)
-        
-        # 添加到布局
-        layout.addWidget(self.thumbnail_label)
-        layout.addWidget(self.filename_label, 1)
-        
-        # 设置整体大小
-        self.setMinimumHeight(90)  # 增加列表项高度
+    两者都存在时用 samefile 比较（可识别符号链接和硬链接），否则比较解析符号链接后的规范化路径
+    """
+    try:
+        return os.path.samefile(path, other)
+    except OSError:
+        return os.path.normcase(os.path.realpath(path)) == os.path.normcase(os.path.realpath(other))
+
 
+def _scaled_config(config: WatermarkConfig, scale: float) -> WatermarkConfig:
+    """返回按 scale 缩放了水印尺寸（字号、描边、阴影偏移、图片水印缩放）的配置副本"""
+    if scale == 1.0:
+        return config
+    return replace(
+        config,
+        font_size=max(1, round(config.font_size * scale)),
+        image_scale=config.image_scale * scale,
+        stroke_width=max(1, round(config.stroke_width * scale)) if config.stroke_width > 0 else config.stroke_width,
+        shadow_offset_x=round(config.shadow_offset_x * scale),
+        shadow_offset_y=round(config.shadow_offset_y * scale),
+    )
+
+
+def _format_file_list(filenames: list, limit: int = 20) -> str:
+    """将文件名列表格式化为对话框中显示的多行文本，超过 limit 个时省略其余部分"""
+    text = "\n".join(filenames[:limit])
+    if len(filenames) > limit:
+        text += f"\n... 等共 {len(filenames)} 个文件"
+    return text
+
+# 确保QApplication已经导入
+from PyQt5.QtWidgets import QApplication
 
 class WatermarkPreview(QLabel):
     """水印预览窗口，支持拖拽"""
@@ -106,10 +116,9 @@ class WatermarkPreview(QLabel):
             self.drag_start_pos = event.pos()
             
             # 获取实际图片在标签中的位置和大小
+            # 只按宽高比计算缩放后的尺寸（QSize.scaled），不实际缩放像素
             pixmap_rect = self.pixmap().rect()
-            scaled_rect = self.pixmap().scaled(
-                self.size(), Qt.KeepAspectRatio, Qt.SmoothTransformation
-            ).rect()
+            scaled_rect = pixmap_rect.size().scaled(self.size(), Qt.KeepAspectRatio)
             
             # 计算相对位置
             if self.width() > scaled_rect.width():
@@ -143,9 +152,62 @@ class WatermarkPreview(QLabel):
             self.is_dragging = False
 
 
+class PreviewSignals(QObject):
+    """预览任务的信号：ready(任务序号, 缓存键, 渲染结果)，跨线程发送时自动排队到界面线程"""
+    
+    ready = pyqtSignal(int, str, QImage)
+
+
+class PreviewJob(QRunnable):
+    """后台渲染预览：加载预览代理图、添加水印并转换为QImage（QPixmap 只能在界面线程创建）
+    
+    load_proxy 返回 (预览代理图, 代理图缩放比例)，失败时返回 None
+    """
+    
+    def __init__(self, image_processor: ImageProcessor, load_proxy: Callable[[], Optional[tuple]],
+                 config: WatermarkConfig, epoch: int, cache_key: str, signals: PreviewSignals):
+        super().__init__()
+        self.image_processor = image_processor
+        self.load_proxy = load_proxy
+        self.config = config
+        self.epoch = epoch
+        self.cache_key = cache_key
+        self.signals = signals
+    
+    def run(self):
+        """在线程池中执行"""
+        try:
+            loaded = self.load_proxy()
+            if loaded is None:
+                raise ValueError("无法加载图片")
+            proxy, proxy_scale = loaded
+            # 按代理图的缩放比例缩放水印尺寸，使预览与导出结果一致
+            config = _scaled_config(self.config, proxy_scale)
+            processed_image = self.image_processor.process_image(proxy, config, preview=True)
+            q_image = self.image_processor.image_to_qimage(processed_image)
+        except Exception as e:
+            print(f"渲染预览失败: {e}")
+            q_image = QImage()
+        self.signals.ready.emit(self.epoch, self.cache_key, q_image)
+
+
 class MainWindow(QMainWindow):
     """主窗口类"""
     
+    # 预览刷新的合并间隔（毫秒）：拖动滑块等连续操作期间只在停顿后重新渲染一次
+    _PREVIEW_DELAY_MS = 40
+    # 预览代理图的最大尺寸：实时预览在缩小后的代理图上渲染，导出时仍使用原图
+    _PREVIEW_MAX_SIZE = (1600, 1600)
+    # QPixmapCache 的容量（KB）：默认的 10 MB 只能容纳一两张预览图
+    _PIXMAP_CACHE_LIMIT_KB = 256 * 1024
+    # 按需生成的预览代理图最多保留的张数（在列表中来回切换时无需重新解码）
+    _PROXY_CACHE_SIZE = 8
+    # 颜色按钮上色块图标的尺寸，以及按颜色缓存的图标数
+    _COLOR_SWATCH_SIZE = QSize(48, 20)
+    _COLOR_ICON_CACHE_SIZE = 32
+    # 支持导入的图片扩展名（拖放和导入文件夹共用）
+    _IMAGE_EXTS = frozenset({'.jpg', '.jpeg', '.png', '.bmp', '.tiff', '.tif'})
+    
     def __init__(self, config_manager: ConfigManager, parent=None):
         super().__init__(parent)
         
@@ -153,9 +215,13 @@ class MainWindow(QMainWindow):
         self.config_manager = config_manager
         self.image_processor = ImageProcessor()
         self.current_config = config_manager.last_config
+        # 启动时配置的副本：关闭窗口时配置未变化则无需重新写入
+        self._saved_config = replace(self.current_config)
         
         # 存储导入的图片
-        self.images = []  # 存储(原始图片路径, PIL图片对象)元组
+        # 存储(原始图片路径, 原图尺寸, 文件名, 不含扩展名的文件名)元组：像素不常驻内存，预览代理图在预览时按需生成，原图在导出时重新加载
+        self.images = []
+        self._proxy_cache = lru_cache(maxsize=self._PROXY_CACHE_SIZE)(self._load_proxy)
         self.current_image_index = -1
         
         # 设置窗口
@@ -165,31 +231,50 @@ class MainWindow(QMainWindow):
         # 启用拖放功能
         self.setAcceptDrops(True)
         
+        # 已渲染的预览按 (图片, 配置) 缓存，切换回之前的图片或设置时无需重新渲染
+        QPixmapCache.setCacheLimit(self._PIXMAP_CACHE_LIMIT_KB)
+        
+        # 合并短时间内的多次预览刷新请求（需在创建UI前创建，init_ui 中会请求首次预览）
+        self._preview_timer = QTimer(self)
+        self._preview_timer.setSingleShot(True)
+        self._preview_timer.setInterval(self._PREVIEW_DELAY_MS)
+        self._preview_timer.timeout.connect(self._do_update_preview)
+        
+        # 预览在线程池中渲染；每次提交递增序号，只显示最新一次提交的结果
+        self._preview_epoch = 0
+        # 预览缓存键的代数：清空图片列表时递增，旧图片的缓存键（含图片索引）不会与新图片混淆
+        self._preview_generation = 0
+        self._preview_signals = PreviewSignals(self)
+        self._preview_signals.ready.connect(self._on_preview_ready)
+        # 窗口隐藏或最小化期间不渲染预览，只记录有待刷新，窗口重新显示时再渲染一次
+        self._preview_pending = False
+        # 最近一次显示或提交渲染的预览缓存键：图片和配置都未变化时不再重复处理
+        self._last_preview_key = None
+        
+        # 颜色按钮的纯色图标，按颜色字符串缓存
+        self._color_icon_cache = {}
+        
         # 创建UI
         self.init_ui()
         
+    def _accept_drop(self, event) -> bool:
+        """检查拖放内容是否为单个图片文件"""
+        # 检查拖放的是否为文件，且只有一个文件且为图片文件
+        if not event.mimeData().hasUrls():
+            return False
+        urls = event.mimeData().urls()
+        return (len(urls) == 1 and
+                os.path.splitext(urls[0].toLocalFile())[1].lower() in self._IMAGE_EXTS)
+    
     def dragEnterEvent(self, event):
         """拖拽进入事件"""
-        # 检查拖放的是否为文件
-        if event.mimeData().hasUrls():
-            # 检查是否只有一个文件且为图片文件
-            urls = event.mimeData().urls()
-            if len(urls) == 1:
-                file_path = urls[0].toLocalFile()
-                ext = os.path.splitext(file_path)[1].lower()
-                if ext in ['.jpg', '.jpeg', '.png', '.bmp', '.tiff', '.tif']:
-                    event.acceptProposedAction()
+        if self._accept_drop(event):
+            event.acceptProposedAction()
     
     def dragMoveEvent(self, event):
-        """拖拽移动事件"""
-        # 与dragEnterEvent相同的检查
-        if event.mimeData().hasUrls():
-            urls = event.mimeData().urls()
-            if len(urls) == 1:
-                file_path = urls[0].toLocalFile()
-                ext = os.path.splitext(file_path)[1].lower()
-                if ext in ['.jpg', '.jpeg', '.png', '.bmp', '.tiff', '.tif']:
-                    event.acceptProposedAction()
+        """拖拽移动事件（拖动过程中持续触发，与dragEnterEvent相同的检查）"""
+        if self._accept_drop(event):
+            event.acceptProposedAction()
     
     def dropEvent(self, event):
         """拖拽释放事件"""
@@ -230,7 +315,9 @@ class MainWindow(QMainWindow):
         # 图片列表
         self.image_list = QListWidget()
         self.image_list.setViewMode(QListWidget.IconMode)
-        self.image_list.setIconSize(QSize(128, 128))
+        # 列表项直接使用图标和文字，由视图统一绘制，不再为每张图片创建一组控件
+        self.image_list.setIconSize(QSize(80, 80))
+        self.image_list.setWordWrap(True)
         self.image_list.setResizeMode(QListWidget.Adjust)
         self.image_list.setSelectionMode(QListWidget.SingleSelection)
         
@@ -282,7 +369,9 @@ class MainWindow(QMainWindow):
         for i, (text, x, y) in enumerate(positions):
             btn = QPushButton(text)
             btn.setFixedSize(60, 30)
-            btn.clicked.connect(lambda checked, x=x, y=y: self.set_watermark_position(x, y))
+            # 位置保存在按钮属性中，所有按钮共用同一个槽函数
+            btn.setProperty("preset_position", (float(x), float(y)))
+            btn.clicked.connect(self._on_preset_position)
             row = i // 3
             col = i % 3
             position_layout.addWidget(btn, row, col)
@@ -332,26 +421,24 @@ class MainWindow(QMainWindow):
         font_layout.addWidget(QLabel("字体:"))
         self.font_combo = QComboBox()
         # 添加系统字体
-        self.fonts = self.image_processor.get_supported_fonts()
+        self.fonts = self.image_processor.get_supported_fonts(self.config_manager.font_cache_file)
         # 存储字体信息映射（名称到路径）
-        self.font_name_to_path = {}
-        for font_info in self.fonts:
-            self.font_combo.addItem(font_info['name'])
-            self.font_name_to_path[font_info['name']] = font_info['path']
+        self.font_name_to_path = {font_info['name']: font_info['path'] for font_info in self.fonts}
+        # 一次性添加全部字体名称，组合框只需重建一次内部模型
+        self.font_combo.addItems([font_info['name'] for font_info in self.fonts])
+        # 字体路径、名称到下拉框行号的索引（重复时取第一行，与 findText 一致），应用配置时无需线性查找
+        self._font_row_by_path = {}
+        self._font_row_by_name = {}
+        for row, font_info in enumerate(self.fonts):
+            self._font_row_by_path.setdefault(font_info['path'], row)
+            self._font_row_by_name.setdefault(font_info['name'], row)
         # 设置默认选中项
-        if self.current_config.font_family:
-            # 检查是否是名称或路径
-            if any(font_info['path'] == self.current_config.font_family for font_info in self.fonts):
-                # 如果是路径，查找对应的名称
-                for font_info in self.fonts:
-                    if font_info['path'] == self.current_config.font_family:
-                        index = self.font_combo.findText(font_info['name'])
-                        if index >= 0:
-                            self.font_combo.setCurrentIndex(index)
-                        break
-            elif self.current_config.font_family in self.font_name_to_path:
-                # 如果是名称
-                self.font_combo.setCurrentText(self.current_config.font_family)
+        if self.current_config.font_family in self._font_row_by_path:
+            # 如果是路径，选中对应的行
+            self.font_combo.setCurrentIndex(self._font_row_by_path[self.current_config.font_family])
+        elif self.current_config.font_family in self._font_row_by_name:
+            # 如果是名称
+            self.font_combo.setCurrentIndex(self._font_row_by_name[self.current_config.font_family])
         font_layout.addWidget(self.font_combo, 1)
         
         # 字号
@@ -383,7 +470,8 @@ class MainWindow(QMainWindow):
         color_layout = QHBoxLayout()
         color_layout.addWidget(QLabel("颜色:"))
         self.color_button = QPushButton()
-        self.color_button.setStyleSheet(f"background-color: {self.current_config.font_color}")
+        self.color_button.setIconSize(self._COLOR_SWATCH_SIZE)
+        self._set_color_button(self.current_config.font_color)
         color_layout.addWidget(self.color_button)
         
         # 添加到文本设置布局
@@ -429,7 +517,8 @@ class MainWindow(QMainWindow):
         self.opacity_slider = QSlider(Qt.Horizontal)
         self.opacity_slider.setRange(0, 100)
         self.opacity_slider.setValue(int(self.current_config.opacity * 100))
-        self.opacity_label = QLabel(f"{int(self.current_config.opacity * 100)}%")
+        # 标签文字取自滑块的值，之后由 on_opacity_changed 随滑块更新
+        self.opacity_label = QLabel(f"{self.opacity_slider.value()}%")
         opacity_layout.addWidget(self.opacity_slider)
         opacity_layout.addWidget(self.opacity_label)
         
@@ -546,7 +635,8 @@ class MainWindow(QMainWindow):
         self.quality_slider = QSlider(Qt.Horizontal)
         self.quality_slider.setRange(1, 100)
         self.quality_slider.setValue(90)
-        self.quality_label = QLabel("90%")
+        # 标签文字取自滑块的值，之后由 on_quality_changed 随滑块更新
+        self.quality_label = QLabel(f"{self.quality_slider.value()}%")
         
         quality_layout.addWidget(self.quality_slider)
         quality_layout.addWidget(self.quality_label)
@@ -670,46 +760,113 @@ class MainWindow(QMainWindow):
         file_paths, _ = QFileDialog.getOpenFileNames(
             self, "选择多张图片", "", "图片文件 (*.jpg *.jpeg *.png *.bmp *.tiff *.tif)"
         )
-        for file_path in file_paths:
-            self._add_image(file_path)
+        self._add_images(file_paths)
     
     def import_folder(self):
         """导入文件夹"""
         folder_path = QFileDialog.getExistingDirectory(self, "选择文件夹")
         if folder_path:
             # 获取文件夹中的所有图片文件
+            file_paths = []
             for root, _, files in os.walk(folder_path):
                 for file in files:
-                    ext = os.path.splitext(file)[1].lower()
-                    if ext in ['.jpg', '.jpeg', '.png', '.bmp', '.tiff', '.tif']:
-                        file_path = os.path.join(root, file)
-                        self._add_image(file_path)
+                    if os.path.splitext(file)[1].lower() in self._IMAGE_EXTS:
+                        file_paths.append(os.path.join(root, file))
+            self._add_images(file_paths)
+    
+    def _add_images(self, file_paths: list):
+        """批量添加图片：在线程池中并行解码并生成缩略图（解码时 Pillow 释放GIL），按原顺序在界面线程中加入列表"""
+        if len(file_paths) <= 1:
+            for file_path in file_paths:
+                self._add_image(file_path)
+            return
+        
+        progress = QProgressDialog("正在导入图片...", "取消", 0, len(file_paths), self)
+        progress.setWindowModality(Qt.WindowModal)
+        progress.setMinimumDuration(500)
+        
+        with ThreadPoolExecutor(max_workers=min(os.cpu_count() or 1, len(file_paths))) as executor:
+            futures = [executor.submit(self._decode_image, file_path) for file_path in file_paths]
+            for done, (file_path, future) in enumerate(zip(file_paths, futures), 1):
+                decoded = future.result()
+                if decoded is not None:
+                    self._insert_image(file_path, decoded)
+                progress.setValue(done)
+                if progress.wasCanceled():
+                    # 取消尚未开始的任务，正在解码的任务结束后丢弃其结果
+                    for pending in futures[done:]:
+                        pending.cancel()
+                    break
+        progress.close()
     
     def _add_image(self, file_path: str):
         """添加图片到列表"""
+        decoded = self._decode_image(file_path)
+        if decoded is not None:
+            self._insert_image(file_path, decoded)
+    
+    def _decode_image(self, file_path: str) -> Optional[tuple]:
+        """加载图片并生成缩略图
+        
+        返回 (缩略图, 原图尺寸)，失败时返回 None；原图在此之后即被释放。
+        只使用 Pillow、不创建Qt对象，可在后台线程中调用
+        """
         # 加载图片
         image = self.image_processor.load_image(file_path)
-        if image:
-            # 创建缩略图
-            thumbnail = self.image_processor.create_thumbnail(image)
-            thumbnail_pixmap = self.image_processor.image_to_pixmap(thumbnail)
-            
-            # 创建列表项
-            filename = os.path.basename(file_path)
-            list_item = QListWidgetItem()
-            list_item_widget = ImageListItem(thumbnail_pixmap, filename)
-            list_item.setSizeHint(list_item_widget.sizeHint())
-            
-            # 添加到列表
-            self.image_list.addItem(list_item)
-            self.image_list.setItemWidget(list_item, list_item_widget)
-            
-            # 存储图片信息
-            self.images.append((file_path, image))
-            
-            # 如果是第一张图片，自动选中
-            if len(self.images) == 1:
-                self.image_list.setCurrentRow(0)
+        if not image:
+            return None
+        
+        # 创建缩略图（JPEG 在此时才首次解码，解码失败的图片不加入列表）
+        thumbnail = self.image_processor.create_thumbnail(image)
+        if thumbnail is None:
+            return None
+        return thumbnail, image.size
+    
+    def _fits_preview(self, size: tuple) -> bool:
+        """原图是否不超过预览代理图的最大尺寸（此时代理图即原图）"""
+        return size[0] <= self._PREVIEW_MAX_SIZE[0] and size[1] <= self._PREVIEW_MAX_SIZE[1]
+    
+    def _load_proxy(self, file_path: str) -> Optional[tuple]:
+        """加载图片并生成预览代理图（由 _proxy_cache 缓存，可在后台线程中调用）
+        
+        返回 (预览代理图, 代理图缩放比例)，失败时返回 None
+        """
+        image = self.image_processor.load_image(file_path)
+        if image is None:
+            return None
+        if self._fits_preview(image.size):
+            # 小图直接使用原图
+            image.load()
+            return image, 1.0
+        # 大图缩小到 _PREVIEW_MAX_SIZE 以内（JPEG 可直接按缩小比例解码）
+        proxy = self.image_processor.create_thumbnail(image, self._PREVIEW_MAX_SIZE, Image.LANCZOS)
+        if proxy is None:
+            return None
+        return proxy, proxy.width / image.width
+    
+    def _insert_image(self, file_path: str, decoded: tuple):
+        """将 _decode_image 的结果加入图片列表（在界面线程中调用）"""
+        thumbnail, image_size = decoded
+        thumbnail_pixmap = self.image_processor.image_to_pixmap(thumbnail)
+        
+        # 创建列表项并添加到列表
+        filename = os.path.basename(file_path)
+        self.image_list.addItem(QListWidgetItem(QIcon(thumbnail_pixmap), filename))
+        
+        # 存储图片信息
+        self.images.append((file_path, image_size, filename, os.path.splitext(filename)[0]))
+        
+        # 如果是第一张图片，自动选中
+        if len(self.images) == 1:
+            self.image_list.setCurrentRow(0)
+    
+    def _get_full_image(self, index: int):
+        """获取指定索引的原图：小图即（缓存的）代理图，大图每次从文件重新加载，用完即释放"""
+        file_path, image_size, *_ = self.images[index]
+        if self._fits_preview(image_size):
+            loaded = self._proxy_cache(file_path)
+            return loaded[0] if loaded is not None else None
+        return self.image_processor.load_image(file_path)
     
     def on_image_selected(self, index: int):
         """当选择图片时更新预览"""
@@ -718,22 +875,53 @@ class MainWindow(QMainWindow):
             self.update_watermark_preview()
     
     def update_watermark_preview(self):
+        """请求更新水印预览：重新启动计时器，间隔内的多次请求合并为一次渲染"""
+        self._preview_timer.start()
+    
+    def _do_update_preview(self):
         """更新水印预览"""
+        if not self.isVisible() or self.isMinimized():
+            self._preview_pending = True
+            return
         if self.current_image_index < 0 or self.current_image_index >= len(self.images):
             return
         
-        # 获取当前图片
-        _, image = self.images[self.current_image_index]
+        file_path, *_ = self.images[self.current_image_index]
         
-        # 更新配置
+        # 更新配置；交给后台任务的是一份副本，之后界面上的修改不会影响正在渲染的任务
         self._update_config_from_ui()
+        config = replace(self.current_config)
+        
+        # 与上次完全相同的请求（如焦点变化、成对触发的单选框信号）直接跳过，正在渲染的结果仍会显示
+        cache_key = f"preview:{self._preview_generation}:{self.current_image_index}:{astuple(config)!r}"
+        if cache_key == self._last_preview_key:
+            return
+        self._last_preview_key = cache_key
         
-        # 处理图片
-        processed_image = self.image_processor.process_image(image, self.current_config)
+        # 相同图片和配置的预览直接取缓存
+        self._preview_epoch += 1
+        pixmap = QPixmapCache.find(cache_key)
+        if pixmap is not None and not pixmap.isNull():
+            self.preview_label.set_image(pixmap)
+            return
         
-        # 转换为pixmap并显示
-        pixmap = self.image_processor.image_to_pixmap(processed_image)
-        self.preview_label.set_image(pixmap)
+        # 在后台线程加载代理图并渲染，界面保持响应；仍在运行的旧任务的结果会被忽略
+        QThreadPool.globalInstance().start(PreviewJob(
+            self.image_processor, partial(self._proxy_cache, file_path), config,
+            self._preview_epoch, cache_key, self._preview_signals))
+    
+    def _on_preview_ready(self, epoch: int, cache_key: str, q_image: QImage):
+        """后台预览渲染完成（在界面线程中执行）"""
+        if q_image.isNull():
+            # 渲染失败时允许相同配置再次尝试
+            if epoch == self._preview_epoch:
+                self._last_preview_key = None
+            return
+        pixmap = QPixmap.fromImage(q_image)
+        QPixmapCache.insert(cache_key, pixmap)
+        # 只显示最新一次提交的结果（清空图片列表也会使序号失效）
+        if epoch == self._preview_epoch:
+            self.preview_label.set_image(pixmap)
     
     def _update_config_from_ui(self):
         """从UI更新配置"""
@@ -743,11 +931,7 @@ class MainWindow(QMainWindow):
         # 文本设置
         self.current_config.text_content = self.text_input.text()
         # 存储字体路径而不是字体名称
-        selected_font_name = self.font_combo.currentText()
-        if selected_font_name in self.font_name_to_path:
-            self.current_config.font_family = self.font_name_to_path[selected_font_name]
-        else:
-            self.current_config.font_family = selected_font_name  # 回退方案
+        self.current_config.font_family = self._selected_font_family()
         self.current_config.font_size = self.font_size_spin.value()
         self.current_config.font_bold = self.bold_checkbox.isChecked()
         self.current_config.font_italic = self.italic_checkbox.isChecked()
@@ -764,12 +948,33 @@ class MainWindow(QMainWindow):
         self.current_config.shadow_enabled = self.shadow_checkbox.isChecked()
         self.current_config.stroke_enabled = self.stroke_checkbox.isChecked()
     
+    def _selected_font_family(self) -> str:
+        """字体下拉框当前选中字体对应的路径，找不到路径时回退为字体名称"""
+        selected_font_name = self.font_combo.currentText()
+        return self.font_name_to_path.get(selected_font_name, selected_font_name)
+    
+    def _set_color_button(self, color_str: str):
+        """以纯色图标显示颜色按钮当前的颜色
+        
+        图标按颜色缓存；不使用样式表，避免每次换色都重新解析样式并刷新按钮所在的布局
+        """
+        icon = self._color_icon_cache.get(color_str)
+        if icon is None:
+            pixmap = QPixmap(self._COLOR_SWATCH_SIZE)
+            pixmap.fill(QColor(color_str))
+            icon = QIcon(pixmap)
+            if len(self._color_icon_cache) >= self._COLOR_ICON_CACHE_SIZE:
+                # 淘汰最早加入的条目
+                del self._color_icon_cache[next(iter(self._color_icon_cache))]
+            self._color_icon_cache[color_str] = icon
+        self.color_button.setIcon(icon)
+    
     def select_text_color(self):
         """选择文本颜色"""
         color = QColorDialog.getColor()
         if color.isValid():
             color_str = color.name()
-            self.color_button.setStyleSheet(f"background-color: {color_str}")
+            self._set_color_button(color_str)
             self.current_config.font_color = color_str
             self.update_watermark_preview()
     
@@ -793,6 +998,11 @@ class MainWindow(QMainWindow):
         self.current_config.position_y = y
         self.update_watermark_preview()
     
+    def _on_preset_position(self):
+        """预设位置按钮点击"""
+        x, y = self.sender().property("preset_position")
+        self.set_watermark_position(x, y)
+    
     def set_watermark_position(self, x: float, y: float):
         """设置水印位置"""
         self.current_config.position_x = x
@@ -858,7 +1068,11 @@ class MainWindow(QMainWindow):
                     QMessageBox.error(self, "错误", "删除模板失败")
     
     def _update_ui_from_config(self):
-        """从配置更新UI"""
+        """从配置更新UI
+        
+        数值框、复选框和滑块在值不变时不会发出信号，可直接设置；文本框（setText 会重置光标和撤销记录）
+        和字体（需要查找字体表）只在与界面当前显示的值不同时才更新
+        """
         # 水印类型
         if self.current_config.watermark_type == "text":
             self.text_watermark_radio.setChecked(True)
@@ -866,39 +1080,31 @@ class MainWindow(QMainWindow):
             self.image_watermark_radio.setChecked(True)
         
         # 文本设置
-        self.text_input.setText(self.current_config.text_content)
-        
-        # 设置字体（如果存在）
-        if hasattr(self, 'font_name_to_path') and self.current_config.font_family:
-            # 尝试根据路径查找字体名称
-            font_name = None
-            for name, path in self.font_name_to_path.items():
-                if path == self.current_config.font_family:
-                    font_name = name
-                    break
-            
-            if font_name:
-                index = self.font_combo.findText(font_name)
-                if index >= 0:
-                    self.font_combo.setCurrentIndex(index)
-            else:
-                # 如果找不到对应的路径，尝试作为名称查找
-                index = self.font_combo.findText(self.current_config.font_family)
-                if index >= 0:
-                    self.font_combo.setCurrentIndex(index)
+        if self.text_input.text() != self.current_config.text_content:
+            self.text_input.setText(self.current_config.text_content)
+        
+        # 设置字体（如果存在，且与当前选中的字体不同）
+        if (hasattr(self, 'font_name_to_path') and self.current_config.font_family and
+                self._selected_font_family() != self.current_config.font_family):
+            # 先按路径查找对应的行，找不到时尝试作为名称查找
+            row = self._font_row_by_path.get(self.current_config.font_family)
+            if row is None:
+                row = self._font_row_by_name.get(self.current_config.font_family)
+            if row is not None:
+                self.font_combo.setCurrentIndex(row)
         
         self.font_size_spin.setValue(self.current_config.font_size)
         self.bold_checkbox.setChecked(self.current_config.font_bold)
         self.italic_checkbox.setChecked(self.current_config.font_italic)
-        self.color_button.setStyleSheet(f"background-color: {self.current_config.font_color}")
+        self._set_color_button(self.current_config.font_color)
         
         # 图片设置
-        self.image_path_input.setText(self.current_config.image_path)
+        if self.image_path_input.text() != self.current_config.image_path:
+            self.image_path_input.setText(self.current_config.image_path)
         self.scale_spin.setValue(self.current_config.image_scale)
         
-        # 通用设置
+        # 通用设置（透明度标签由滑块的 valueChanged 信号更新）
         self.opacity_slider.setValue(int(self.current_config.opacity * 100))
-        self.opacity_label.setText(f"{int(self.current_config.opacity * 100)}%")
         self.rotation_spin.setValue(self.current_config.rotation)
         
         # 高级效果
@@ -916,7 +1122,7 @@ class MainWindow(QMainWindow):
             is_same_as_source = False
             source_dirs = set()
             
-            for file_path, _ in self.images:
+            for file_path, *_ in self.images:
                 source_dir = os.path.dirname(file_path)
                 source_dirs.add(source_dir)
                 
@@ -981,54 +1187,123 @@ class MainWindow(QMainWindow):
         file_format = self.format_combo.currentText()
         quality = self.quality_slider.value()
         
+        # 命名规则在循环外读取一次，循环内只拼接字符串
+        keep_original_name = self.original_name_radio.isChecked()
+        if self.add_prefix_radio.isChecked():
+            prefix, suffix = self.prefix_input.text(), ""
+        else:  # add_suffix
+            prefix, suffix = "", self.suffix_input.text()
+        extension = file_format.lower()
+        
         # 导出文件
         success_count = 0
-        failed_count = 0
+        conflicts = []  # 会覆盖原文件而被跳过的文件名
+        failures = []  # 导出失败的文件名
         
+        # 在界面线程中生成输出文件名并检查是否覆盖原文件，只把需要导出的图片提交到线程池
+        jobs = []
         for index in indices:
-            file_path, image = self.images[index]
-            
-            # 处理图片
-            processed_image = self.image_processor.process_image(image, self.current_config)
-            
-            # 生成输出文件名
-            original_filename = os.path.basename(file_path)
-            name_without_ext, ext = os.path.splitext(original_filename)
+            # 文件名及不含扩展名的部分在导入时已拆分好
+            file_path, _, original_filename, name_without_ext = self.images[index]
             
             # 根据命名规则生成文件名
-            if self.original_name_radio.isChecked():
+            if keep_original_name:
                 new_filename = original_filename
-            elif self.add_prefix_radio.isChecked():
-                new_filename = f"{self.prefix_input.text()}{name_without_ext}.{file_format.lower()}"
-            else:  # add_suffix
-                new_filename = f"{name_without_ext}{self.suffix_input.text()}.{file_format.lower()}"
+            else:
+                new_filename = f"{prefix}{name_without_ext}{suffix}.{extension}"
             
             # 生成完整路径
             output_path = os.path.join(output_dir, new_filename)
             
-            # 检查是否与原文件相同
-            if os.path.abspath(output_path) == os.path.abspath(file_path):
-                QMessageBox.warning(self, "警告", f"禁止覆盖原文件: {original_filename}")
-                failed_count += 1
+            # 检查是否与原文件相同（冲突在导出结束后统一提示，不逐个弹出对话框）
+            if _is_same_file(output_path, file_path):
+                conflicts.append(original_filename)
                 continue
             
-            # 导出图片
-            if self.image_processor.export_image(processed_image, output_path, file_format, quality):
-                success_count += 1
-            else:
-                failed_count += 1
+            jobs.append((index, output_path, original_filename))
         
-        # 显示结果
+        if jobs:
+            # 并行处理和导出（Pillow 在解码、合成和编码时释放GIL），界面线程只负责更新进度
+            progress = QProgressDialog("正在导出图片...", "取消", 0, len(jobs), self)
+            progress.setWindowModality(Qt.WindowModal)
+            progress.setMinimumDuration(500)
+            
+            # 工作线程使用配置副本：导出期间界面线程修改配置不会影响正在导出的图片
+            config = replace(self.current_config)
+            with ThreadPoolExecutor(max_workers=min(os.cpu_count() or 1, len(jobs))) as executor:
+                futures = [executor.submit(self._export_one, index, output_path, config, file_format, quality)
+                           for index, output_path, _ in jobs]
+                for done, future in enumerate(futures, 1):
+                    future.result()
+                    progress.setValue(done)
+                    if progress.wasCanceled():
+                        # 取消尚未开始的任务，正在导出的任务结束后仍计入结果
+                        for pending in futures[done:]:
+                            pending.cancel()
+                        break
+            progress.close()
+            
+            # 线程池退出时所有未取消的任务均已完成
+            for (_, _, filename), future in zip(jobs, futures):
+                if future.cancelled():
+                    continue
+                if future.result():
+                    success_count += 1
+                else:
+                    failures.append(filename)
+        
+        # 显示结果：每类结果只弹出一个汇总对话框
         if success_count > 0:
             QMessageBox.information(self, "完成", f"成功导出 {success_count} 张图片")
-        if failed_count > 0:
-            QMessageBox.warning(self, "警告", f"有 {failed_count} 张图片导出失败")
+        if conflicts:
+            QMessageBox.warning(self, "警告", f"以下 {len(conflicts)} 张图片会覆盖原文件，已跳过:\n"
+                                + _format_file_list(conflicts))
+        if failures:
+            QMessageBox.warning(self, "警告", f"有 {len(failures)} 张图片导出失败:\n"
+                                + _format_file_list(failures))
+    
+    def _export_one(self, index: int, output_path: str, config: WatermarkConfig,
+                    file_format: str, quality: int) -> bool:
+        """处理并导出单张图片（只使用 Pillow，可在后台线程中调用）"""
+        image = self._get_full_image(index)
+        if image is None:
+            return False
+        try:
+            # JPEG 延迟到这里才解码：导入后被替换或截断的文件在此报错，计为导出失败
+            processed_image = self.image_processor.process_image(image, config)
+        except (OSError, ValueError) as e:
+            print(f"处理图片失败: {e}")
+            return False
+        return self.image_processor.export_image(processed_image, output_path, file_format, quality)
+    
+    def showEvent(self, event):
+        """窗口显示事件：补上隐藏期间被跳过的预览刷新"""
+        super().showEvent(event)
+        self._flush_pending_preview()
+    
+    def changeEvent(self, event):
+        """窗口状态变化事件：从最小化恢复时补上被跳过的预览刷新"""
+        super().changeEvent(event)
+        if event.type() == QEvent.WindowStateChange and not self.isMinimized():
+            self._flush_pending_preview()
+    
+    def _flush_pending_preview(self):
+        """如有被跳过的预览刷新，重新请求一次"""
+        if self._preview_pending:
+            self._preview_pending = False
+            self.update_watermark_preview()
     
     def closeEvent(self, event):
         """窗口关闭事件"""
-        # 保存当前配置
+        # 保存当前配置（与启动时相同则跳过写入）；在后台线程中写入配置副本，磁盘或网络驱动器较慢时
+        # 窗口也能立即关闭，非守护线程保证写入在进程退出前完成
         self._update_config_from_ui()
-        self.config_manager.save_last_config(self.current_config)
+        if self.current_config != self._saved_config:
+            threading.Thread(target=self.config_manager.save_last_config,
+                             args=(replace(self.current_config),)).start()
+        
+        # 等待仍在运行的预览任务结束，避免其在窗口销毁后发送信号
+        QThreadPool.globalInstance().waitForDone()
         
         # 接受关闭事件
         event.accept()
@@ -1045,8 +1320,13 @@ class MainWindow(QMainWindow):
         if reply == QMessageBox.Yes:
             # 清空列表
             self.image_list.clear()
-            # 清空图片数据
+            # 清空图片数据及其预览缓存，仍在渲染的预览结果不再显示
             self.images = []
+            self._proxy_cache.cache_clear()
+            QPixmapCache.clear()
+            self._preview_generation += 1
+            self._preview_epoch += 1
+            self._last_preview_key = None
             # 重置当前索引
             self.current_image_index = -1
             # 清空预览窗口